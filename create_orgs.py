@@ -7,11 +7,13 @@ with organizations that need to be created in Snyk.
 
 from typing import Dict, List
 import argparse
-import json
 import sys
 from src.logging_utils import setup_logging
 from src.csv_utils import read_applications_from_csv
-from src.file_utils import sanitize_path, sanitize_input_path, safe_write_json, safe_write_json_to_logs, build_output_path_in_logs, validate_file_exists, log_error_and_exit, validate_non_empty_string
+from src.file_utils import sanitize_path, sanitize_input_path, safe_write_json, safe_write_json_to_logs, write_json_file, build_output_path_in_logs, validate_file_exists, log_error_and_exit, validate_non_empty_strings
+
+# Snyk rejects organization names longer than this
+MAX_ORG_NAME_LENGTH = 60
 
 
 class SnykOrgCreator:
@@ -47,37 +49,26 @@ class SnykOrgCreator:
             print("❌ No applications found in CSV")
             return
         
-        # Find unique application names
-        unique_app_names = set()
-        for app in applications:
-            unique_app_names.add(app['application_name'])
+        # Find unique application names, sorted once for the listing and the output file
+        unique_app_names = sorted({app['application_name'] for app in applications})
         
-        # Validate application names don't exceed 60 characters
-        invalid_names = []
-        for app_name in unique_app_names:
-            if len(app_name) > 60:
-                invalid_names.append(app_name)
+        # Validate application names don't exceed 60 characters (already in sorted order)
+        invalid_names = [app_name for app_name in unique_app_names if len(app_name) > MAX_ORG_NAME_LENGTH]
         
         if invalid_names:
-            error_msg = "❌ Error: The following application names exceed 60 characters:"
-            print(error_msg)
-            self.logger.error(error_msg)
-            for invalid_name in sorted(invalid_names):
-                invalid_msg = f"   - '{invalid_name}' ({len(invalid_name)} characters)"
-                print(invalid_msg)
-                self.logger.error(invalid_msg)
-            final_msg = f"\nSnyk organization names must be 60 characters or less. Please shorten these application names in your CSV and try again."
-            print(final_msg)
-            self.logger.error(final_msg)
-            sys.exit(1)
+            # Report every violation as one message: a single console write and a single log record
+            report_lines = ["❌ Error: The following application names exceed 60 characters:"]
+            report_lines.extend(f"   - '{invalid_name}' ({len(invalid_name)} characters)" for invalid_name in invalid_names)
+            report_lines.append(f"\nSnyk organization names must be 60 characters or less. Please shorten these application names in your CSV and try again.")
+            log_error_and_exit("\n".join(report_lines), self.logger)
         
         print(f"📋 Found {len(unique_app_names)} unique applications to create as organizations:")
-        for org_name in sorted(unique_app_names):
+        for org_name in unique_app_names:
             print(f"   - {org_name}")
         
         # Create orgs structure
         orgs_to_create = []
-        for org_name in sorted(unique_app_names):
+        for org_name in unique_app_names:
             org_data = {
                 "name": org_name,
                 "groupId": self.group_id
@@ -92,33 +83,7 @@ class SnykOrgCreator:
         orgs_json = {"orgs": orgs_to_create}
         
         # Write to file - path is already validated by build_output_path_in_logs or sanitize_path
-        try:
-            with open(output_json_path, 'w') as f:
-                json.dump(orgs_json, f, indent=2)
-            
-            success_msg = f"📄 Created file: {output_json_path}"
-            print(success_msg)
-            if self.logger:
-                self.logger.info(success_msg)
-                
-        except PermissionError:
-            error_msg = f"❌ Error: Permission denied writing to {output_json_path}"
-            print(error_msg)
-            if self.logger:
-                self.logger.error(error_msg)
-            sys.exit(1)
-        except OSError as e:
-            error_msg = f"❌ Error: Failed to write file {output_json_path}: {e}"
-            print(error_msg)
-            if self.logger:
-                self.logger.error(error_msg)
-            sys.exit(1)
-        except Exception as e:
-            error_msg = f"❌ Error: Unexpected error writing file {output_json_path}: {e}"
-            print(error_msg)
-            if self.logger:
-                self.logger.error(error_msg)
-            sys.exit(1)
+        write_json_file(orgs_json, output_json_path, self.logger)
         
         print(f"   Organizations to create: {len(orgs_to_create)}")
 
@@ -158,11 +123,12 @@ Examples:
 
     # Input validation
     validate_file_exists(args.csv_file, logger)
-    validate_non_empty_string(args.group_id, "Group ID", logger)
+    required_strings = {"Group ID": args.group_id}
     
     # Validate source org ID format if provided
     if args.source_org_id:
-        validate_non_empty_string(args.source_org_id, "Source org ID", logger)
+        required_strings["Source org ID"] = args.source_org_id
+    validate_non_empty_strings(required_strings, logger)
     
     # Generate automatic filename if not provided
     if not args.output:
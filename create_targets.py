@@ -7,21 +7,18 @@ and automatically detecting the appropriate integration types.
 
 import json
 import os
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 import argparse
 import sys
 import requests
 import re
-from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 from src.logging_utils import setup_logging, log_progress, log_error_with_context
 from src.csv_utils import read_applications_from_csv
-from src.api import rate_limit, get_auth_headers, display_auth_status, make_request_with_retry
-from src.file_utils import sanitize_path, sanitize_input_path, safe_write_json, safe_write_json_to_logs, build_output_path_in_logs, validate_file_exists, log_error_and_exit, validate_positive_integer
-
-# Disable SSL warnings for corporate networks/proxies
-import urllib3
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from src.api import TokenBucket, get_auth_headers, display_auth_status, make_request_with_retry, create_session, parse_json_response
+from src.file_utils import sanitize_path, sanitize_input_path, safe_write_json, safe_write_json_to_logs, write_json_file, build_output_path_in_logs, validate_file_exists, log_error_and_exit, validate_positive_integers
 
 
 try:
@@ -31,6 +28,20 @@ except ImportError:
     PANDAS_AVAILABLE = False
     print("Warning: pandas not available, using basic CSV parsing")
 
+# Organizations column values meaning a repository has not been imported yet
+NOT_IMPORTED_VALUES = frozenset({'', 'nan', 'n/a'})
+
+# exclusionGlobs applied to every target unless --exclusion-globs is given
+DEFAULT_EXCLUSION_GLOBS = "fixtures, tests, __tests__, node_modules"
+
+
+def build_org_mapping(orgs: List[Dict]) -> Dict[str, str]:
+    """
+    Build the application name -> org ID lookup in a single pass over the organizations
+    Keys are the exact org display names, matching the application names from the CSV
+    """
+    return {org['display_name']: org['id'] for org in orgs}
+
 
 class SnykTargetMapper:
     # SCM pattern definitions for filtering applications
@@ -57,6 +68,53 @@ class SnykTargetMapper:
         }
     }
 
+    # Map common integration type names to what's stored in the JSON
+    INTEGRATION_TYPE_MAPPING = {
+        'github': 'github',
+        'github-cloud-app': 'github-cloud-app',
+        'gitlab': 'gitlab',
+        'azure-repos': 'azure-repos',
+        'github-enterprise': 'github-enterprise'
+    }
+
+    # GitLab GraphQL batch lookup - the projects(fullPaths:) filter accepts at most 50 paths
+    GITLAB_GRAPHQL_BATCH_SIZE = 50
+    GITLAB_PROJECTS_QUERY = (
+        "query($fullPaths: [String!]) { projects(fullPaths: $fullPaths, first: 50) "
+        "{ nodes { id fullPath repository { rootRef } } } }"
+    )
+
+    # Longest repository URL worth parsing - anything longer is malformed input
+    MAX_REPOSITORY_URL_LENGTH = 1024
+
+    # Default branch lookup handler per source type (method names, resolved on the instance)
+    BRANCH_API_HANDLERS = {
+        'github': '_github_default_branch',
+        'github-cloud-app': '_github_default_branch',
+        'github-enterprise': '_github_default_branch',
+        'gitlab': '_gitlab_default_branch',
+        'azure-repos': '_azure_default_branch'
+    }
+    # Source types whose default branch can be looked up through the SCM API
+    BRANCH_API_SOURCE_TYPES = frozenset(BRANCH_API_HANDLERS)
+
+    # Repository URL parsing: Azure DevOps project/_git/repo, otherwise the last two path segments
+    _AZURE_URL_RE = re.compile(r'([^/]+)/_git/(.+?)/*$')
+    _OWNER_REPO_RE = re.compile(r'([^/:]+)/([^/]+)/*$')
+
+    # SCM API URL patterns, compiled once and shared by all worker threads
+    _GITHUB_REPO_RE = re.compile(r'github\.com[/:]([^/]+)/([^/]+?)/?$')
+    _GITLAB_COM_RE = re.compile(r'gitlab\.com[/:](.*[^/])/*$')
+    _GITLAB_HTTP_RE = re.compile(r'^https?://([^/]*gitlab[^/]*)/(.*[^/])/*$')
+    _GITLAB_SSH_RE = re.compile(r'^git@([^:]*gitlab[^:]*):(.+?)(?:\.git)?/*$')
+    _AZURE_REPO_RE = re.compile(r'dev\.azure\.com/([^/]+)/([^/]+)/_git/([^/]+)')
+    # Control characters never appear in a usable repository URL
+    _URL_CONTROL_CHAR_RE = re.compile(r'[\x00-\x1f\x7f]')
+    # Project paths made only of unreserved URL characters need nothing but '/' escaped
+    _SAFE_PROJECT_PATH_RE = re.compile(r'[A-Za-z0-9._~/-]+')
+    # Commit pinned with a '#<sha>' URL suffix: an abbreviated or full lowercase hex SHA
+    _COMMIT_SHA_RE = re.compile(r'[0-9a-f]{7,40}')
+
     def __init__(self, group_id: str, orgs_json_file: str = "snyk-created-orgs.json", debug: bool = False):
         self.group_id = group_id
         self.orgs_json_file = orgs_json_file
@@ -64,23 +122,47 @@ class SnykTargetMapper:
         self.logger = setup_logging('create_targets', debug=debug)
         # Rate limiting configuration - auto-tune based on repository count
         self.rate_limit_requests_per_minute = 1000  # Will be auto-tuned
-        self.request_interval = 60.0 / self.rate_limit_requests_per_minute  # Will be recalculated
-        self.last_request_time = 0
-        self.request_lock = threading.Lock()
         # Concurrent processing configuration - auto-tune based on repository count  
         self.max_workers = 10  # Will be auto-tuned
+        # Token bucket shared by all workers: bursts up to max_workers, then the steady rate
+        self.rate_limiter = TokenBucket(self.rate_limit_requests_per_minute, capacity=self.max_workers)
+        # Shared HTTP session so SCM API calls reuse keep-alive connections
+        self.session = create_session(self.max_workers)
         # Retry configuration
         self.max_retries = 3
         self.retry_delay = 1  # Initial delay in seconds
         self.retry_backoff = 2  # Exponential backoff multiplier
+        # Parsed (owner, repo_name) per repository URL - CSVs often repeat the same URL
+        self._url_cache: Dict[str, Optional[Tuple[str, str]]] = {}
+        # Lookup indexes built when organizations are loaded
+        self._org_by_id: Dict[str, Dict] = {}
+        self._integration_cache: Dict[Tuple[str, str], Optional[str]] = {}
+        # Default branch per (source type, repository URL), shared by worker threads
+        self._branch_cache: Dict[Tuple[str, str], Optional[str]] = {}
+        self._branch_cache_lock = threading.Lock()
+        # GitLab project info (id, default branch) per repository URL, successful lookups only
+        self._gitlab_info_cache: Dict[str, Dict] = {}
+        self._gitlab_info_cache_lock = threading.Lock()
+        # Auth headers per SCM type, resolved from the environment on first use
+        self._auth_headers_cache: Dict[str, Optional[Dict[str, str]]] = {}
+        # Repository URLs already reported as skipped by _is_api_url_candidate
+        self._rejected_api_urls: Set[str] = set()
+        self._rejected_api_urls_lock = threading.Lock()
+        # Load organizations up front so per-repository lookups need no lazy-load check
+        self.load_organizations_from_json()
     
     def should_include_application(self, app: Dict, source_type: str) -> bool:
         """
         Determine if an application should be included based on its Repository URL and Asset Source
         Uses consistent URL OR Asset Source matching for all SCM types
         """
-        asset_source = app.get('asset_source', '').lower().strip()
-        repository_url = app.get('repository_url', '').lower().strip()
+        # Prefer the normalized fields precomputed by the CSV reader
+        asset_source = app.get('asset_source_norm')
+        if asset_source is None:
+            asset_source = app.get('asset_source', '').lower().strip()
+        repository_url = app.get('repository_url_norm')
+        if repository_url is None:
+            repository_url = app.get('repository_url', '').lower().strip()
         
         # Get patterns for the specified source type
         patterns = self.SCM_PATTERNS.get(source_type)
@@ -177,10 +259,12 @@ class SnykTargetMapper:
                 self.logger.debug(f"   Rate limit reasoning: {rate_reason}")
                 self.logger.debug(f"   Scaling applied: {scale_reason}")
         
-        # Recalculate request interval
-        self.request_interval = 60.0 / self.rate_limit_requests_per_minute
-        if self.logger:
-            self.logger.debug(f"   Calculated request interval: {self.request_interval:.3f} seconds between requests")
+        # Size the connection pool to the tuned worker count
+        self.session.close()
+        self.session = create_session(self.max_workers)
+        
+        # Rebuild the limiter for the tuned rate and burst size
+        self.rate_limiter = TokenBucket(self.rate_limit_requests_per_minute, capacity=self.max_workers)
         
         # Show performance summary
         estimated_time_minutes = (repository_count / self.max_workers) * 0.1  # Much faster estimate: 0.1 min per repo per worker
@@ -192,7 +276,7 @@ class SnykTargetMapper:
         
         if self.logger:
             self.logger.info(f"Performance auto-tuning completed: {self.max_workers} workers, {self.rate_limit_requests_per_minute} req/min")
-            self.logger.debug(f"   Performance metrics - Est. time: {estimated_time_minutes:.1f}-{estimated_time_minutes*2:.1f} min, Request interval: {self.request_interval:.3f}s")
+            self.logger.debug(f"   Performance metrics - Est. time: {estimated_time_minutes:.1f}-{estimated_time_minutes*2:.1f} min")
         
         # Add performance tip
         if repository_count > 1000:
@@ -221,14 +305,21 @@ class SnykTargetMapper:
             if self.logger:
                 self.logger.error(msg)
             self.org_data = []
+        
+        # Index organizations by ID so per-repository lookups are O(1)
+        self._org_by_id = {org.get('id'): org for org in self.org_data}
+        self._integration_cache = {}
+    
+    def close(self) -> None:
+        """
+        Close the shared HTTP session and its pooled keep-alive connections
+        """
+        self.session.close()
     
     def get_organizations_from_group(self) -> List[Dict]:
         """
         Get organizations from the loaded JSON file
         """
-        if self.org_data is None:
-            self.load_organizations_from_json()
-        
         org_info = []
         for org in self.org_data:
             org_info.append({
@@ -245,43 +336,33 @@ class SnykTargetMapper:
         """
         Get integrations for a specific organization from loaded JSON data
         """
-        if self.org_data is None:
-            self.load_organizations_from_json()
+        org = self._org_by_id.get(org_id)
+        if org is None:
+            self.logger.debug(f"No organization found with ID {org_id}")
+            return {}
         
-        for org in self.org_data:
-            if org.get('id') == org_id:
-                integrations = org.get('integrations', {})
-                print(f"Found {len(integrations)} integrations for org {org_id}")
-                return integrations
-                
-        print(f"No organization found with ID {org_id}")
-        return {}
+        integrations = org.get('integrations', {})
+        self.logger.debug(f"Found {len(integrations)} integrations for org {org_id}")
+        return integrations
     
     def find_integration_id(self, org_id: str, integration_type: str) -> Optional[str]:
         """
         Find the integration ID for a specific integration type in an organization
+        Results are cached per (org, integration type) since every repository in an org repeats the lookup
         """
-        if self.org_data is None:
-            self.load_organizations_from_json()
+        target_type = self.INTEGRATION_TYPE_MAPPING.get(integration_type.lower(), integration_type.lower())
+        cache_key = (org_id, target_type)
+        if cache_key in self._integration_cache:
+            return self._integration_cache[cache_key]
         
         integrations = self.get_integrations_for_org(org_id)
-        
-        # Map common integration type names to what's stored in the JSON
-        integration_mapping = {
-            'github': 'github',
-            'github-cloud-app': 'github-cloud-app',
-            'gitlab': 'gitlab',
-            'azure-repos': 'azure-repos',
-            'github-enterprise': 'github-enterprise'
-        }
-        
-        target_type = integration_mapping.get(integration_type.lower(), integration_type.lower())
         integration_id = integrations.get(target_type)
         
         if not integration_id:
-            print(f"No integration of type '{integration_type}' found for org {org_id}")
-            print(f"Available integrations: {list(integrations.keys())}")
+            self.logger.debug(f"No integration of type '{integration_type}' found for org {org_id}")
+            self.logger.debug(f"Available integrations: {list(integrations.keys())}")
         
+        self._integration_cache[cache_key] = integration_id
         return integration_id
     
     def read_applications_from_csv(self, csv_file_path: str) -> List[Dict]:
@@ -292,89 +373,293 @@ class SnykTargetMapper:
         print(f"Found {len(applications)} repository entries from CSV (filtered by Type = Repository)")
         return applications
     
+    def _deduplicate_applications(self, applications: List[Dict], org_mapping: Dict[str, str]) -> List[Dict]:
+        """
+        Drop entries that would produce the same target as an earlier one: the same repository
+        (normalized URL - whitespace, trailing slash and .git ignored) and CSV default branch,
+        imported into the same org
+        Expects applications already filtered to mapped orgs, so URL parsing, integration lookup
+        and API calls happen once per distinct target; the first occurrence is kept
+        """
+        unique_applications = {}
+        for app in applications:
+            key = (
+                self._normalize_repository_url(app.get('repository_url', '')),
+                org_mapping.get(app['application_name']),
+                (app.get('default_branch') or '').strip()
+            )
+            if key not in unique_applications:
+                unique_applications[key] = app
+
+        duplicate_count = len(applications) - len(unique_applications)
+        if duplicate_count:
+            print(f"🔁 Skipping {duplicate_count} duplicate repository entries (same repository and organization)")
+            if self.logger:
+                self.logger.info(f"Deduplicated applications: {len(applications)} -> {len(unique_applications)}")
+
+        return list(unique_applications.values())
+
     def _display_auth_status(self):
         """
         Display authentication status for SCM APIs
         """
         display_auth_status(getattr(self, 'source_type', 'github'))
 
+    def _is_api_url_candidate(self, repository_url: str) -> bool:
+        """
+        Cheap pre-check before running URL regexes: non-empty, bounded length, no control characters
+        Scheme-less URLs such as 'github.com/owner/repo' pass; the SCM regexes decide whether they match.
+        Rejected values skip API lookups and each one is reported once
+        """
+        repository_url = repository_url.strip()
+        if (0 < len(repository_url) <= self.MAX_REPOSITORY_URL_LENGTH
+                and not self._URL_CONTROL_CHAR_RE.search(repository_url)):
+            return True
+        if repository_url:
+            with self._rejected_api_urls_lock:
+                first_rejection = repository_url not in self._rejected_api_urls
+                self._rejected_api_urls.add(repository_url)
+            if first_rejection:
+                shown_url = repository_url if len(repository_url) <= 100 else f"{repository_url[:100]}..."
+                print(f"⚠️  Skipping API lookup for {shown_url}: URL is longer than {self.MAX_REPOSITORY_URL_LENGTH} characters or contains control characters")
+                self.logger.warning(f"Skipping API lookup for unsupported repository URL: {shown_url}")
+        return False
+
+    def _get_auth_headers(self, scm_type: str, source_type: str) -> Optional[Dict[str, str]]:
+        """
+        Get authentication headers for an SCM API, built once per mapper
+        Tokens don't change during a run, so the environment lookup and encoding happen on first use only;
+        a new mapper reads the token environment variables again
+        """
+        if scm_type not in self._auth_headers_cache:
+            self._auth_headers_cache[scm_type] = get_auth_headers(scm_type, source_type, self.logger)
+        return self._auth_headers_cache[scm_type]
+
+    def _split_commit_sha(self, repository_url: str) -> Tuple[str, Optional[str]]:
+        """
+        Split a '#<sha>' commit suffix off a repository URL
+        Returns (url_without_sha, sha); a '#' suffix that is not a hex commit SHA stays in the URL
+        """
+        base_url, separator, sha = repository_url.rpartition('#')
+        if separator and self._COMMIT_SHA_RE.fullmatch(sha.strip()):
+            return base_url.rstrip(), sha.strip()
+        return repository_url, None
+
     def get_default_branch(self, repository_url: str, source_type: str) -> Optional[str]:
+        """
+        Get the default branch for a repository, fetching it from the API on first use
+        Results are cached per repository so duplicate CSV entries cost a single API call
+        A URL pinned to a commit ('...#<sha>') has no branch to look up, so None is returned without any API call
+        """
+        repository_url, commit_sha = self._split_commit_sha(repository_url)
+        if commit_sha:
+            return None
+        # No branch API for this source type - skip the cache and URL parsing entirely
+        if source_type not in self.BRANCH_API_SOURCE_TYPES:
+            return 'main'
+        # Malformed or oversized URLs can't be looked up - reject before any regex runs
+        if not self._is_api_url_candidate(repository_url):
+            return 'main'
+        
+        cache_key = (source_type, self._repository_cache_key(repository_url))
+        with self._branch_cache_lock:
+            if cache_key in self._branch_cache:
+                return self._branch_cache[cache_key]
+        
+        default_branch = self._fetch_default_branch(repository_url, source_type)
+        with self._branch_cache_lock:
+            self._branch_cache[cache_key] = default_branch
+        return default_branch
+
+    def _fetch_default_branch(self, repository_url: str, source_type: str) -> Optional[str]:
         """
         Fetch the default branch for a repository from its API
-        Returns None if unable to determine
+        Dispatches on source type to the matching SCM handler; falls back to 'main'
         """
         try:
             if repository_url.endswith('.git'):
                 repository_url = repository_url[:-4]
             # Repositories already filtered by should_include_application(), just use source type
-            if source_type in ['github', 'github-cloud-app', 'github-enterprise']:
-                match = re.search(r'github\.com[/:]([^/]+)/([^/]+?)/?$', repository_url)
-                if match:
-                    owner, repo = match.groups()
-                    api_url = f"https://api.github.com/repos/{owner}/{repo}"
-                    auth_headers = get_auth_headers('github', source_type, self.logger)
-                    response = make_request_with_retry(api_url, self.max_retries, self.retry_delay, self.retry_backoff, lambda: self._rate_limit_wrapper(), headers=auth_headers, logger=self.logger)
-                    if response and response.status_code == 200:
-                        repo_data = response.json()
-                        return repo_data.get('default_branch', 'main')
-            elif source_type == 'gitlab':
-                project_path = None
-                api_base = None
-                if 'gitlab.com' in repository_url:
-                    match = re.search(r'gitlab\.com[/:](.+?)/?$', repository_url)
-                    if match:
-                        project_path = match.group(1)
-                        api_base = "https://gitlab.com/api/v4"
-                else:
-                    match = re.search(r'https?://([^/]*gitlab[^/]*)/(.+?)/?$', repository_url)
-                    if match:
-                        gitlab_host, project_path = match.groups()
-                        api_base = f"https://{gitlab_host}/api/v4"
-                    else:
-                        match = re.search(r'git@([^:]*gitlab[^:]*):(.+?)(?:\.git)?/?$', repository_url)
-                        if match:
-                            gitlab_host, project_path = match.groups()
-                            api_base = f"https://{gitlab_host}/api/v4"
-                if project_path and api_base:
-                    encoded_path = requests.utils.quote(project_path, safe='')
-                    api_url = f"{api_base}/projects/{encoded_path}"
-                    auth_headers = get_auth_headers('gitlab', source_type, self.logger)
-                    response = make_request_with_retry(api_url, self.max_retries, self.retry_delay, self.retry_backoff, lambda: self._rate_limit_wrapper(), headers=auth_headers, logger=self.logger)
-                    if response and response.status_code == 200:
-                        project_data = response.json()
-                        return project_data.get('default_branch', 'main')
-                    elif response and response.status_code == 404:
-                        if auth_headers:
-                            print(f"⚠️  GitLab project not found or no access: {repository_url}")
-                        else:
-                            print(f"⚠️  GitLab project not found or private: {repository_url} (set GITLAB_TOKEN)")
-                        return 'main'
-                    elif response and response.status_code in [401, 403]:
-                        print(f"⚠️  GitLab authentication issue for {repository_url} (check GITLAB_TOKEN)")
-                        return 'main'
-            elif source_type == 'azure-repos':
-                match = re.search(r'dev\.azure\.com/([^/]+)/([^/]+)/_git/([^/]+)', repository_url)
-                if match:
-                    organization, project, repo = match.groups()
-                    api_url = f"https://dev.azure.com/{organization}/{project}/_apis/git/repositories/{repo}?api-version=6.0"
-                    auth_headers = get_auth_headers('azure', source_type, self.logger)
-                    response = make_request_with_retry(api_url, self.max_retries, self.retry_delay, self.retry_backoff, lambda: self._rate_limit_wrapper(), headers=auth_headers, logger=self.logger)
-                    if response and response.status_code == 200:
-                        repo_data = response.json()
-                        return repo_data.get('defaultBranch', 'refs/heads/main').replace('refs/heads/', '')
+            handler = self.BRANCH_API_HANDLERS.get(source_type)
+            if handler:
+                default_branch = getattr(self, handler)(repository_url, source_type)
+                if default_branch:
+                    return default_branch
             return 'main'
         except Exception as e:
             print(f"⚠️  Could not determine default branch for {repository_url}: {e}")
             return 'main'
 
+    def _github_default_branch(self, repository_url: str, source_type: str) -> Optional[str]:
+        """Fetch the default branch from the GitHub repos API"""
+        match = self._GITHUB_REPO_RE.search(repository_url)
+        if not match:
+            return None
+        owner, repo = match.groups()
+        api_url = f"https://api.github.com/repos/{owner}/{repo}"
+        auth_headers = self._get_auth_headers('github', source_type)
+        response = make_request_with_retry(api_url, self.max_retries, self.retry_delay, self.retry_backoff, lambda: self._rate_limit_wrapper(), headers=auth_headers, logger=self.logger, session=self.session)
+        if response and response.status_code == 200:
+            repo_data = parse_json_response(response)
+            return repo_data.get('default_branch', 'main')
+        return None
+
+    def _gitlab_default_branch(self, repository_url: str, source_type: str) -> Optional[str]:
+        """Fetch the default branch from the GitLab projects API"""
+        gitlab_project = self._gitlab_project_api_url(repository_url)
+        if not gitlab_project:
+            return None
+        api_url, project_path = gitlab_project
+        auth_headers = self._get_auth_headers('gitlab', source_type)
+        response = make_request_with_retry(api_url, self.max_retries, self.retry_delay, self.retry_backoff, lambda: self._rate_limit_wrapper(), headers=auth_headers, logger=self.logger, session=self.session)
+        if response and response.status_code == 200:
+            project_data = parse_json_response(response)
+            return project_data.get('default_branch', 'main')
+        elif response and response.status_code == 404:
+            if auth_headers:
+                print(f"⚠️  GitLab project not found or no access: {repository_url}")
+            else:
+                print(f"⚠️  GitLab project not found or private: {repository_url} (set GITLAB_TOKEN)")
+        elif response and response.status_code in [401, 403]:
+            print(f"⚠️  GitLab authentication issue for {repository_url} (check GITLAB_TOKEN)")
+        return None
+
+    def _azure_default_branch(self, repository_url: str, source_type: str) -> Optional[str]:
+        """Fetch the default branch from the Azure DevOps git repositories API"""
+        match = self._AZURE_REPO_RE.search(repository_url)
+        if not match:
+            return None
+        organization, project, repo = match.groups()
+        api_url = f"https://dev.azure.com/{organization}/{project}/_apis/git/repositories/{repo}?api-version=6.0"
+        auth_headers = self._get_auth_headers('azure', source_type)
+        response = make_request_with_retry(api_url, self.max_retries, self.retry_delay, self.retry_backoff, lambda: self._rate_limit_wrapper(), headers=auth_headers, logger=self.logger, session=self.session)
+        if response and response.status_code == 200:
+            repo_data = parse_json_response(response)
+            return repo_data.get('defaultBranch', 'refs/heads/main').replace('refs/heads/', '')
+        return None
+
+    def _gitlab_project_location(self, repository_url: str) -> Optional[Tuple[str, str]]:
+        """
+        Split a GitLab repository URL (without the .git suffix) into its instance URL and project path
+        Handles gitlab.com, self-hosted HTTP(S) instances and SSH URLs
+        Returns (instance_url, project_path) or None if the URL is not a recognizable GitLab URL
+        """
+        if 'gitlab.com' in repository_url:
+            # e.g. https://gitlab.com/group/project
+            match = self._GITLAB_COM_RE.search(repository_url)
+            if not match:
+                return None
+            return "https://gitlab.com", match.group(1)
+        
+        # e.g. https://gitlab.company.com/group/project or git@gitlab.company.com:group/project.git
+        match = self._GITLAB_HTTP_RE.search(repository_url) or self._GITLAB_SSH_RE.search(repository_url)
+        if not match:
+            return None
+        gitlab_host, project_path = match.groups()
+        return f"https://{gitlab_host}", project_path
+
+    def _gitlab_project_api_url(self, repository_url: str) -> Optional[Tuple[str, str]]:
+        """
+        Build the GitLab projects REST API URL for a repository URL (without the .git suffix)
+        Returns (api_url, project_path) or None if the URL is not a recognizable GitLab URL
+        """
+        location = self._gitlab_project_location(repository_url)
+        if not location:
+            return None
+        instance_url, project_path = location
+        # URL encode the project path - the common all-ASCII case only needs its slashes escaped
+        if self._SAFE_PROJECT_PATH_RE.fullmatch(project_path):
+            encoded_path = project_path.replace('/', '%2F')
+        else:
+            encoded_path = requests.utils.quote(project_path, safe='')
+        return f"{instance_url}/api/v4/projects/{encoded_path}", project_path
+
+    def _batch_gitlab_projects(self, repository_urls: List[str], source_type: str) -> Dict[str, Dict]:
+        """
+        Look up GitLab projects in batches through the GraphQL API, one request per 50 projects per instance
+        Returns project info ('id', 'default_branch') for the repository URLs that were found;
+        missing URLs (not found, no access, or a failed request) are left for the per-project REST lookup
+        """
+        # Group project paths by GitLab instance - each instance has its own GraphQL endpoint
+        paths_by_instance: Dict[str, Dict[str, List[str]]] = {}
+        for repository_url in repository_urls:
+            if not self._is_api_url_candidate(repository_url):
+                continue
+            location = self._gitlab_project_location(self._normalize_repository_url(repository_url))
+            if location:
+                instance_url, project_path = location
+                paths_by_instance.setdefault(instance_url, {}).setdefault(project_path.lower(), []).append(repository_url)
+        
+        # GraphQL authenticates personal access tokens as bearer tokens
+        rest_headers = self._get_auth_headers('gitlab', source_type)
+        headers = {'Authorization': f"Bearer {rest_headers['PRIVATE-TOKEN']}"} if rest_headers else None
+        
+        found = {}
+        for instance_url, urls_by_path in paths_by_instance.items():
+            project_paths = list(urls_by_path)
+            for start in range(0, len(project_paths), self.GITLAB_GRAPHQL_BATCH_SIZE):
+                batch = project_paths[start:start + self.GITLAB_GRAPHQL_BATCH_SIZE]
+                response = make_request_with_retry(
+                    f"{instance_url}/api/graphql", self.max_retries, self.retry_delay, self.retry_backoff,
+                    lambda: self._rate_limit_wrapper(), headers=headers, logger=self.logger, session=self.session,
+                    json_body={'query': self.GITLAB_PROJECTS_QUERY, 'variables': {'fullPaths': batch}}
+                )
+                if not response:
+                    continue
+                try:
+                    nodes = parse_json_response(response)['data']['projects']['nodes']
+                except (ValueError, KeyError, TypeError) as e:
+                    self.logger.debug(f"Unexpected GitLab GraphQL response from {instance_url}: {e}")
+                    continue
+                for node in nodes:
+                    try:
+                        repository = node.get('repository') or {}
+                        project_info = {
+                            # Global IDs look like gid://gitlab/Project/123
+                            'id': int(node['id'].rsplit('/', 1)[-1]),
+                            # Empty repositories have no rootRef, matching a null REST default_branch
+                            'default_branch': repository.get('rootRef')
+                        }
+                        full_path = node.get('fullPath', '').lower()
+                    except (ValueError, KeyError, TypeError, AttributeError) as e:
+                        # Skipped projects fall back to the per-project REST lookup
+                        self.logger.debug(f"Skipping malformed GitLab GraphQL project node from {instance_url}: {e}")
+                        continue
+                    for repository_url in urls_by_path.get(full_path, []):
+                        found[repository_url] = project_info
+        
+        self.logger.debug(f"GitLab GraphQL batch lookup found {len(found)}/{len(repository_urls)} projects")
+        return found
+
     def _rate_limit_wrapper(self):
-        # Wrapper to use api.py's rate_limit with instance state
-        # Use a list for last_request_time to allow mutation in api.py
-        if not hasattr(self, '_last_request_time_ref'):
-            self._last_request_time_ref = [self.last_request_time]
-        rate_limit(self.request_lock, self._last_request_time_ref, self.request_interval)
+        # Wrapper so API helpers can take a token from the mapper's shared bucket
+        self.rate_limiter.acquire()
     
+    def _repository_cache_key(self, repository_url: str) -> str:
+        """Cache key for per-repository API results: normalized URL, case-insensitive"""
+        return self._normalize_repository_url(repository_url).lower()
+
     def get_gitlab_project_info(self, repository_url: str, source_type: str) -> Optional[Dict]:
+        """
+        Get GitLab project information including project ID and default branch
+        Successful lookups are cached per repository so repeated URLs cost a single API call
+        Returns dict with 'id' and 'default_branch' or None if unable to determine
+        """
+        if source_type != 'gitlab' or not self._is_api_url_candidate(repository_url):
+            return None
+        
+        cache_key = self._repository_cache_key(repository_url)
+        with self._gitlab_info_cache_lock:
+            if cache_key in self._gitlab_info_cache:
+                return self._gitlab_info_cache[cache_key]
+        
+        project_info = self._fetch_gitlab_project_info(repository_url, source_type)
+        if project_info is not None:
+            with self._gitlab_info_cache_lock:
+                self._gitlab_info_cache[cache_key] = project_info
+        return project_info
+
+    def _fetch_gitlab_project_info(self, repository_url: str, source_type: str) -> Optional[Dict]:
         """
         Fetch GitLab project information including project ID and default branch
         Returns dict with 'id' and 'default_branch' or None if unable to determine
@@ -388,84 +673,130 @@ class SnykTargetMapper:
             if repository_url.endswith('.git'):
                 repository_url = repository_url[:-4]
             
-            # Check if this is a GitLab repository
-            if 'gitlab.com' in repository_url or 'gitlab' in repository_url.lower():
-                project_path = None
-                api_base = None
+            # Non-GitLab URLs don't match the GitLab URL patterns (the host must contain 'gitlab')
+            gitlab_project = self._gitlab_project_api_url(repository_url)
+            
+            if gitlab_project:
+                api_url, project_path = gitlab_project
+                
+                # Get authentication headers if available
+                # Auth status is shown once at startup; per-project notes only go to the debug log
+                auth_headers = self._get_auth_headers('gitlab', source_type)
                 
-                # Extract project path from URL like https://gitlab.com/group/project
-                if 'gitlab.com' in repository_url:
-                    match = re.search(r'gitlab\.com[/:](.+?)/?$', repository_url)
-                    if match:
-                        project_path = match.group(1)
-                        api_base = "https://gitlab.com/api/v4"
+                if auth_headers:
+                    self.logger.debug(f"Using GitLab authentication for project: {project_path}")
                 else:
-                    # Try custom GitLab instance pattern
-                    # Handle formats like: https://gitlab.company.com/group/project
-                    match = re.search(r'https?://([^/]*gitlab[^/]*)/(.+?)/?$', repository_url)
-                    if match:
-                        gitlab_host, project_path = match.groups()
-                        api_base = f"https://{gitlab_host}/api/v4"
-                    else:
-                        # Try SSH format: git@gitlab.company.com:group/project.git
-                        match = re.search(r'git@([^:]*gitlab[^:]*):(.+?)(?:\.git)?/?$', repository_url)
-                        if match:
-                            gitlab_host, project_path = match.groups()
-                            api_base = f"https://{gitlab_host}/api/v4"
+                    self.logger.debug(f"No GitLab authentication - private projects may fail: {project_path}")
                 
-                if project_path and api_base:
-                    # URL encode the project path
-                    encoded_path = requests.utils.quote(project_path, safe='')
-                    
-                    api_url = f"{api_base}/projects/{encoded_path}"
-                    
-                    # Get authentication headers if available
-                    auth_headers = get_auth_headers('gitlab', source_type, self.logger)
-                    
+                response = make_request_with_retry(api_url, self.max_retries, self.retry_delay, self.retry_backoff, lambda: self._rate_limit_wrapper(), headers=auth_headers, logger=self.logger, session=self.session)
+                if response and response.status_code == 200:
+                    project_data = parse_json_response(response)
+                    return {
+                        'id': project_data.get('id'),
+                        'default_branch': project_data.get('default_branch', 'main')
+                    }
+                elif response and response.status_code == 404:
                     if auth_headers:
-                        print(f"🔐 Using GitLab authentication for project: {project_path}")
+                        print(f"⚠️  GitLab project not found or no access: {repository_url} (check project path and token permissions)")
                     else:
-                        print(f"⚠️  No GitLab authentication - private projects may fail: {project_path}")
-                    
-                    response = make_request_with_retry(api_url, self.max_retries, self.retry_delay, self.retry_backoff, lambda: self._rate_limit_wrapper(), headers=auth_headers, logger=self.logger)
-                    if response and response.status_code == 200:
-                        project_data = response.json()
-                        return {
-                            'id': project_data.get('id'),
-                            'default_branch': project_data.get('default_branch', 'main')
-                        }
-                    elif response and response.status_code == 404:
-                        if auth_headers:
-                            print(f"⚠️  GitLab project not found or no access: {repository_url} (check project path and token permissions)")
-                        else:
-                            print(f"⚠️  GitLab project not found or private: {repository_url} (set GITLAB_TOKEN for private projects)")
-                        return None
-                    elif response and response.status_code == 401:
-                        print(f"⚠️  GitLab authentication failed for {repository_url} (check GITLAB_TOKEN)")
-                        return None
-                    elif response and response.status_code == 403:
-                        print(f"⚠️  GitLab access forbidden for {repository_url} (check token permissions)")
-                        return None
-                    elif response:
-                        print(f"⚠️  GitLab API returned {response.status_code} for {repository_url}")
-                        return None
-                    else:
-                        print(f"⚠️  Failed to get GitLab project info for {repository_url}")
-                        return None
-            
+                        print(f"⚠️  GitLab project not found or private: {repository_url} (set GITLAB_TOKEN for private projects)")
+                    return None
+                elif response and response.status_code == 401:
+                    print(f"⚠️  GitLab authentication failed for {repository_url} (check GITLAB_TOKEN)")
+                    return None
+                elif response and response.status_code == 403:
+                    print(f"⚠️  GitLab access forbidden for {repository_url} (check token permissions)")
+                    return None
+                elif response:
+                    print(f"⚠️  GitLab API returned {response.status_code} for {repository_url}")
+                    return None
+                else:
+                    print(f"⚠️  Failed to get GitLab project info for {repository_url}")
+                    return None
+        
             return None
             
         except Exception as e:
             print(f"⚠️  Could not fetch GitLab project info for {repository_url}: {e}")
             return None
     
+    def _parse_files_override(self, files_override: Optional[str]) -> List[Dict[str, str]]:
+        """
+        Convert the comma-separated --files override into the targets "files" array
+        The list is read-only once built, so every target can share the same one
+        """
+        if not files_override:
+            return []
+        files = [{"path": path.strip()} for path in files_override.split(',') if path.strip()]
+        if files:
+            print(f"📄 Using override files for all repositories: {len(files)} files")
+        return files
+    
+    def _resolve_exclusion_globs(self, exclusion_globs_override: Optional[str]) -> str:
+        """
+        Resolve the exclusionGlobs value applied to every target in a batch
+        An override (even an empty string) replaces the default
+        """
+        if exclusion_globs_override is None:
+            return DEFAULT_EXCLUSION_GLOBS
+        if exclusion_globs_override:
+            print(f"🚫 Using override exclusionGlobs for all repositories: {exclusion_globs_override}")
+        else:
+            print("🚫 Using empty exclusionGlobs for all repositories (no exclusions)")
+        return exclusion_globs_override
+    
+    def _prefetch_gitlab_project_info(self, repository_urls: List[str], source_type: str) -> Dict[str, Optional[Dict]]:
+        """
+        Fetch GitLab project info for many repositories
+        Uses batched GraphQL lookups first, then concurrent per-project REST calls for the rest
+        Returns a dict mapping each repository URL to its project info (or None)
+        """
+        if not repository_urls:
+            return {}
+        
+        # Resolve as many projects as possible with batched GraphQL requests first
+        project_infos = {}
+        with self._gitlab_info_cache_lock:
+            for repository_url in repository_urls:
+                cache_key = self._repository_cache_key(repository_url)
+                if cache_key in self._gitlab_info_cache:
+                    project_infos[repository_url] = self._gitlab_info_cache[cache_key]
+        uncached = [url for url in repository_urls if url not in project_infos]
+        if len(uncached) > 1:
+            batched = self._batch_gitlab_projects(uncached, source_type)
+            with self._gitlab_info_cache_lock:
+                for repository_url, project_info in batched.items():
+                    self._gitlab_info_cache[self._repository_cache_key(repository_url)] = project_info
+            project_infos.update(batched)
+        
+        # Fall back to one REST lookup per remaining project
+        repository_urls = [url for url in repository_urls if url not in project_infos]
+        if not repository_urls:
+            return project_infos
+        if self.max_workers <= 1 or len(repository_urls) == 1:
+            project_infos.update({url: self.get_gitlab_project_info(url, source_type) for url in repository_urls})
+            return project_infos
+        
+        print(f"🚀 Fetching GitLab project info for {len(repository_urls)} repositories with {self.max_workers} concurrent workers...")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            infos = executor.map(lambda url: self.get_gitlab_project_info(url, source_type), repository_urls)
+            project_infos.update(zip(repository_urls, infos))
+        return project_infos
+    
     def create_gitlab_targets(self, applications: List[Dict], org_mapping: Dict[str, str], source_type: str, branch_override: Optional[str] = None, files_override: Optional[str] = None, exclusion_globs_override: Optional[str] = None) -> List[Dict]:
         """
         Create GitLab targets structure
         Applications are already filtered by source type and limit in create_targets_json().
         """
         targets = []
+        # Parse the --files override once; all targets share the resulting list
+        files = self._parse_files_override(files_override)
+        exclusion_globs = self._resolve_exclusion_globs(exclusion_globs_override)
+        if branch_override:
+            print(f"📋 Using override branch '{branch_override}' for all repositories")
         
+        # First pass: resolve org and integration for each application (no network I/O)
+        eligible = []
         for app in applications:
             app_name = app['application_name']
             org_id = org_mapping.get(app_name)
@@ -487,15 +818,26 @@ class SnykTargetMapper:
                 print(f"⚠️  No repository URL for {app_name}")
                 continue
             
-            # Fetch project info from GitLab API
+            # A '#<sha>' commit suffix is not part of the project path
+            repository_url, _ = self._split_commit_sha(repository_url)
+            csv_branch = (app.get('default_branch') or '').strip()
+            eligible.append((app_name, org_id, integration_id, repository_url, csv_branch))
+        
+        # Fetch project info from the GitLab API concurrently, once per unique repository URL
+        gitlab_infos = self._prefetch_gitlab_project_info(
+            list(dict.fromkeys(repository_url for _, _, _, repository_url, _ in eligible)), source_type
+        )
+        
+        # Second pass: build targets from the fetched project info
+        for app_name, org_id, integration_id, repository_url, csv_branch in eligible:
             project_id = None
             detected_default_branch = None
             
-            gitlab_info = self.get_gitlab_project_info(repository_url, source_type)
+            gitlab_info = gitlab_infos.get(repository_url)
             if gitlab_info and gitlab_info.get('id'):
                 project_id = gitlab_info['id']
                 detected_default_branch = gitlab_info.get('default_branch')
-                print(f"📋 Auto-detected GitLab project ID for {app_name}: {project_id}")
+                self.logger.debug(f"Auto-detected GitLab project ID for {app_name}: {project_id}")
             else:
                 print(f"⚠️  Could not determine GitLab project ID for {app_name} from URL: {repository_url}")
                 continue
@@ -509,49 +851,81 @@ class SnykTargetMapper:
                 }
             }
             
-            # Add branch - prioritize override, then auto-detected from API
+            # Add branch - prioritize override, then the CSV Default Branch column, then auto-detected from API
             if branch_override:
                 # Use the command line override branch for all repositories
                 target["target"]["branch"] = branch_override
-                print(f"📋 Using override branch '{branch_override}' for {app_name}")
+                self.logger.debug(f"Using override branch '{branch_override}' for {app_name}")
+            elif csv_branch:
+                target["target"]["branch"] = csv_branch
+                self.logger.debug(f"Using CSV default branch '{csv_branch}' for {app_name}")
             elif detected_default_branch:
                 # Use the default branch detected from GitLab API
                 target["target"]["branch"] = detected_default_branch
-                print(f"📋 Using GitLab default branch '{detected_default_branch}' for {app_name}")
+                self.logger.debug(f"Using GitLab default branch '{detected_default_branch}' for {app_name}")
             else:
-                # Fallback to detecting branch separately
-                default_branch = self.get_default_branch(repository_url, source_type)
-                if default_branch:
-                    target["target"]["branch"] = default_branch
-                    print(f"📋 Auto-detected default branch '{default_branch}' for {app_name}")
+                # The project lookup already returned no default branch (e.g. an empty repository);
+                # asking the same projects API again would too, so leave the branch unset
+                self.logger.debug(f"No GitLab default branch for {app_name}, leaving branch unset")
             
             # Add files if specified from override
-            if files_override:
-                # Convert comma-separated string to array of objects
-                file_paths = [path.strip() for path in files_override.split(',') if path.strip()]
-                if file_paths:
-                    target["files"] = [{"path": path} for path in file_paths]
-                    print(f"📄 Using override files for {app_name}: {len(file_paths)} files")
+            if files:
+                target["files"] = files
+                self.logger.debug(f"Using override files for {app_name}: {len(files)} files")
             
-            # Add exclusionGlobs - use override or default
-            if exclusion_globs_override is not None:
-                # Use override (even if empty string)
-                target["exclusionGlobs"] = exclusion_globs_override
-                if exclusion_globs_override:
-                    print(f"🚫 Using override exclusionGlobs for {app_name}: {exclusion_globs_override}")
-                else:
-                    print(f"🚫 Using empty exclusionGlobs for {app_name} (no exclusions)")
-            else:
-                # Use default exclusionGlobs
-                target["exclusionGlobs"] = "fixtures, tests, __tests__, node_modules"
+            # Add exclusionGlobs - override or default, resolved once above
+            target["exclusionGlobs"] = exclusion_globs
             
             targets.append(target)
         
         return targets
     
 
+    def _parse_repository_url(self, repository_url: str) -> Optional[Tuple[str, str]]:
+        """
+        Parse (owner, repo_name) from a repository URL (without the .git suffix)
+        Results are cached per URL so duplicate CSV rows are only parsed once
+        """
+        if repository_url in self._url_cache:
+            return self._url_cache[repository_url]
+        
+        parsed = None
+        if 'dev.azure.com' in repository_url:
+            match = self._AZURE_URL_RE.search(repository_url)
+            if match:
+                parsed = match.groups()
+            else:
+                print(f"⚠️  Unsupported Azure DevOps URL format: {repository_url}")
+        else:
+            # GitHub, GitLab and generic URLs: owner and repo are the last two path segments
+            match = self._OWNER_REPO_RE.search(repository_url)
+            if match:
+                parsed = match.groups()
+            else:
+                print(f"⚠️  Cannot parse repository URL: {repository_url}")
+        
+        self._url_cache[repository_url] = parsed
+        return parsed
+
+    def _normalize_repository_url(self, repository_url: str) -> str:
+        """
+        Normalize a repository URL for duplicate detection (whitespace, trailing slash, .git suffix)
+        A pinned '#<sha>' is kept so the same repository at different commits stays distinct
+        """
+        repository_url, commit_sha = self._split_commit_sha(repository_url.strip())
+        repository_url = repository_url.rstrip('/')
+        if repository_url.endswith('.git'):
+            repository_url = repository_url[:-4]
+        return f"{repository_url}#{commit_sha}" if commit_sha else repository_url
+
     def _process_repository_batch(self, repositories: List[Dict], org_mapping: Dict[str, str], source_type: str, branch_override: Optional[str], files_override: Optional[str], exclusion_globs_override: Optional[str], max_workers: int = 10) -> List[Dict]:
         """Process repositories concurrently with thread pool"""
+        # Parse the --files override once; all targets share the resulting list
+        files = self._parse_files_override(files_override)
+        exclusion_globs = self._resolve_exclusion_globs(exclusion_globs_override)
+        if branch_override:
+            print(f"📋 Using override branch '{branch_override}' for all repositories")
+
         def process_single_repository(app):
             try:
                 app_name = app['application_name']
@@ -567,30 +941,14 @@ class SnykTargetMapper:
                 if not integration_id:
                     print(f"⚠️  No {source_type} integration found for org {org_id} (app: {app_name})")
                     return None
+                repository_url, commit_sha = self._split_commit_sha(repository_url)
+                csv_branch = (app.get('default_branch') or '').strip()
                 if repository_url.endswith('.git'):
                     repository_url = repository_url[:-4]
-                # Parse owner/repo
-                if 'github.com' in repository_url or 'gitlab' in repository_url:
-                    parts = repository_url.rstrip('/').split('/')
-                    owner = parts[-2]
-                    repo_name = parts[-1]
-                elif 'dev.azure.com' in repository_url:
-                    if '_git' in repository_url:
-                        parts = repository_url.split('_git/')
-                        repo_name = parts[-1].rstrip('/')
-                        project_parts = parts[0].rstrip('/').split('/')
-                        owner = project_parts[-1]
-                    else:
-                        print(f"⚠️  Unsupported Azure DevOps URL format: {repository_url}")
-                        return None
-                else:
-                    parts = repository_url.rstrip('/').split('/')
-                    if len(parts) >= 2:
-                        owner = parts[-2]
-                        repo_name = parts[-1]
-                    else:
-                        print(f"⚠️  Cannot parse repository URL: {repository_url}")
-                        return None
+                parsed = self._parse_repository_url(repository_url)
+                if not parsed:
+                    return None
+                owner, repo_name = parsed
                 target = {
                     "orgId": org_id,
                     "integrationId": integration_id,
@@ -601,78 +959,99 @@ class SnykTargetMapper:
                 }
                 if branch_override:
                     target["target"]["branch"] = branch_override
-                    print(f"📋 Using override branch '{branch_override}' for {app_name}")
+                    self.logger.debug(f"Using override branch '{branch_override}' for {app_name}")
+                elif csv_branch:
+                    # A branch given in the CSV needs no API lookup
+                    target["target"]["branch"] = csv_branch
+                    self.logger.debug(f"Using CSV default branch '{csv_branch}' for {app_name}")
+                elif commit_sha:
+                    # A commit is not a branch - leave it unset so Snyk uses the repository default
+                    self.logger.debug(f"Repository URL for {app_name} is pinned to commit {commit_sha}, skipping branch lookup")
                 else:
                     default_branch = self.get_default_branch(repository_url, source_type)
                     if default_branch:
                         target["target"]["branch"] = default_branch
-                        print(f"📋 Auto-detected default branch '{default_branch}' for {app_name}")
-                if files_override:
-                    file_paths = [path.strip() for path in files_override.split(',') if path.strip()]
-                    if file_paths:
-                        target["files"] = [{"path": path} for path in file_paths]
-                        print(f"📄 Using override files for {app_name}: {len(file_paths)} files")
-                if exclusion_globs_override is not None:
-                    target["exclusionGlobs"] = exclusion_globs_override
-                    if exclusion_globs_override:
-                        print(f"🚫 Using override exclusionGlobs for {app_name}: {exclusion_globs_override}")
-                    else:
-                        print(f"🚫 Using empty exclusionGlobs for {app_name} (no exclusions)")
-                else:
-                    target["exclusionGlobs"] = "fixtures, tests, __tests__, node_modules"
+                        self.logger.debug(f"Auto-detected default branch '{default_branch}' for {app_name}")
+                if files:
+                    target["files"] = files
+                    self.logger.debug(f"Using override files for {app_name}: {len(files)} files")
+                target["exclusionGlobs"] = exclusion_globs
                 return target
             except Exception as e:
                 print(f"❌ Error processing {app.get('application_name', 'Unknown')}: {e}")
                 return None
-        targets = []
         total_repos = len(repositories)
-        print(f"🚀 Processing {total_repos} repositories with {max_workers} concurrent workers...")
+        # With a branch override no API calls are made, so the per-repository work is
+        # pure CPU: run it inline instead of paying for a pool (threads can't parallelize it)
+        run_inline = bool(branch_override)
+        if run_inline:
+            print(f"🚀 Processing {total_repos} repositories (branch override set, no API calls needed)...")
+        else:
+            print(f"🚀 Processing {total_repos} repositories with {max_workers} concurrent workers...")
         
         if self.logger:
-            self.logger.info(f"Starting parallel processing: {total_repos} repositories, {max_workers} workers")
-            self.logger.debug(f"Processing configuration: timeout=60s, rate_limit={self.rate_limit_requests_per_minute}/min")
+            if run_inline:
+                self.logger.info(f"Starting inline processing: {total_repos} repositories (branch override, no API calls)")
+            else:
+                self.logger.info(f"Starting parallel processing: {total_repos} repositories, {max_workers} workers")
+            self.logger.debug(f"Processing configuration: rate_limit={self.rate_limit_requests_per_minute}/min")
+        
+        def iter_results():
+            """Yield (index, result, error) for each repository as it finishes"""
+            if run_inline:
+                for i, app in enumerate(repositories):
+                    yield i, process_single_repository(app), None
+                return
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(process_single_repository, app): i for i, app in enumerate(repositories)}
+                for future in as_completed(futures):
+                    try:
+                        yield futures[future], future.result(), None
+                    except Exception as e:
+                        yield futures[future], None, e
+        
+        # Collect results as they finish, but keep the output in CSV order
+        results = [None] * len(repositories)
+        completed = 0
+        created = 0
+        errors = 0
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = [executor.submit(process_single_repository, app) for app in repositories]
-            completed = 0
-            errors = 0
+        for i, result, error in iter_results():
+            completed += 1
+            if error is not None:
+                errors += 1
+                error_msg = f"Repository processing failed: {error}"
+                print(f"❌ {error_msg}")
+                
+                if self.logger:
+                    app_name = repositories[i].get('application_name', f'repo-{i+1}')
+                    log_error_with_context(self.logger, f"Processing failed for {app_name}", error)
+                continue
             
-            for i, future in enumerate(futures):
-                try:
-                    result = future.result(timeout=60)
-                    if result:
-                        targets.append(result)
-                        if self.logger:
-                            app_name = repositories[i].get('application_name', f'repo-{i+1}')
-                            self.logger.debug(f"✅ Successfully processed {app_name} (target created)")
-                    else:
-                        if self.logger:
-                            app_name = repositories[i].get('application_name', f'repo-{i+1}')
-                            self.logger.debug(f"⚪ Processed {app_name} (no target created - filtered or error)")
-                    
-                    completed += 1
-                    
-                    # Progress logging - more frequent in debug mode
-                    if completed % 100 == 0 or completed == total_repos:
-                        print(f"📊 Progress: {completed}/{total_repos} repositories processed ({len(targets)} targets created)")
-                        if self.logger:
-                            log_progress(self.logger, completed, total_repos, "repository")
-                    elif completed % 25 == 0 and self.logger:
-                        # Debug-only frequent progress updates
-                        log_progress(self.logger, completed, total_repos, "repository")
-                        
-                except Exception as e:
-                    errors += 1
-                    completed += 1
-                    error_msg = f"Repository processing failed: {e}"
-                    print(f"❌ {error_msg}")
-                    
-                    if self.logger:
-                        app_name = repositories[i].get('application_name', f'repo-{i+1}') if i < len(repositories) else 'unknown'
-                        log_error_with_context(self.logger, f"Processing failed for {app_name}", e)
+            if result:
+                results[i] = result
+                created += 1
+                if self.logger:
+                    app_name = repositories[i].get('application_name', f'repo-{i+1}')
+                    self.logger.debug(f"✅ Successfully processed {app_name} (target created)")
+            else:
+                if self.logger:
+                    app_name = repositories[i].get('application_name', f'repo-{i+1}')
+                    self.logger.debug(f"⚪ Processed {app_name} (no target created - filtered or error)")
+            
+            # Progress logging - more frequent in debug mode
+            if completed % 100 == 0 or completed == total_repos:
+                print(f"📊 Progress: {completed}/{total_repos} repositories processed ({created} targets created)")
+                if self.logger:
+                    log_progress(self.logger, completed, total_repos, "repository")
+            elif completed % 25 == 0 and self.logger:
+                # Debug-only frequent progress updates
+                log_progress(self.logger, completed, total_repos, "repository")
+        
+        targets = [result for result in results if result]
         
         if self.logger:
-            self.logger.info(f"Parallel processing completed: {len(targets)} targets created, {errors} errors")
+            self.logger.info(f"Repository processing completed: {len(targets)} targets created, {errors} errors")
             if errors > 0:
                 self.logger.warning(f"Processing completed with {errors} errors out of {total_repos} repositories")
         
@@ -712,9 +1091,7 @@ class SnykTargetMapper:
         existing_orgs = self.get_organizations_from_group()
         
         # Create mapping from application name to org ID
-        org_mapping = {}
-        for org in existing_orgs:
-            org_mapping[org['display_name']] = org['id']
+        org_mapping = build_org_mapping(existing_orgs)
         
         print(f"Organization mapping:")
         for app_name, org_id in org_mapping.items():
@@ -781,7 +1158,7 @@ class SnykTargetMapper:
                 print(f"❌ Error parsing row numbers '{rows}': {e}")
                 print("   Examples: --rows 2,5,8 (individual) or --rows 2-5 (range) or --rows 2,5-8,10 (mixed)")
                 return
-        
+
         # Auto-tune performance settings based on repository count
         self._auto_tune_performance(len(applications), source_type, max_workers, rate_limit)
         
@@ -792,14 +1169,10 @@ class SnykTargetMapper:
             # Handle both string "N/A" and pandas NaN values
             def is_not_imported(app):
                 orgs_value = app.get('organizations', '')
-                
-                # Handle pandas NaN values (which show up as float nan)
-                if str(orgs_value).lower() in ['nan', 'n/a'] or orgs_value == '' or orgs_value is None:
+                if orgs_value is None:
                     return True
-                    
-                # Handle string values
-                orgs_str = str(orgs_value).strip().upper()
-                return orgs_str in ['N/A', 'NAN'] or orgs_str == ''
+                # Normalize once; str() also covers pandas NaN values (which show up as float nan)
+                return str(orgs_value).strip().lower() in NOT_IMPORTED_VALUES
             
             applications = [app for app in applications if is_not_imported(app)]
             filtered_count = len(applications)
@@ -834,6 +1207,11 @@ class SnykTargetMapper:
         filtered_count = len(filtered_applications)
         print(f"🔍 Filtered to {filtered_count}/{original_count} applications matching {source_type}")
         
+        # Collapse duplicate rows so per-target work runs once per distinct repository. This runs
+        # after the --empty-org-only filter so a not-imported copy of a repository is never dropped
+        # in favour of an imported one, and before --limit so the limit counts distinct targets
+        filtered_applications = self._deduplicate_applications(filtered_applications, org_mapping)
+        
         # Apply limit AFTER filtering by source type
         if limit and limit > 0:
             pre_limit_count = len(filtered_applications)
@@ -863,42 +1241,13 @@ class SnykTargetMapper:
         targets_json = {"targets": targets}
         
         # Write to file - path is already validated by build_output_path_in_logs or sanitize_path
-        try:
-            with open(output_json_path, 'w') as f:
-                json.dump(targets_json, f, indent=2)
-            
-            success_msg = f"📄 Created file: {output_json_path}"
-            print(success_msg)
-            if self.logger:
-                self.logger.info(success_msg)
-                
-        except PermissionError:
-            error_msg = f"❌ Error: Permission denied writing to {output_json_path}"
-            print(error_msg)
-            if self.logger:
-                self.logger.error(error_msg)
-            sys.exit(1)
-        except OSError as e:
-            error_msg = f"❌ Error: Failed to write file {output_json_path}: {e}"
-            print(error_msg)
-            if self.logger:
-                self.logger.error(error_msg)
-            sys.exit(1)
-        except Exception as e:
-            error_msg = f"❌ Error: Unexpected error writing file {output_json_path}: {e}"
-            print(error_msg)
-            if self.logger:
-                self.logger.error(error_msg)
-            sys.exit(1)
+        write_json_file(targets_json, output_json_path, self.logger)
         
         print(f"   Targets created: {len(targets)}")
         
         # Summary by organization
-        org_counts = {}
-        for target in targets:
-            org_id = target['orgId']
-            org_name = next((org['display_name'] for org in existing_orgs if org['id'] == org_id), org_id)
-            org_counts[org_name] = org_counts.get(org_name, 0) + 1
+        id_to_name = {org['id']: org['display_name'] for org in existing_orgs}
+        org_counts = Counter(id_to_name.get(target['orgId'], target['orgId']) for target in targets)
         
         print(f"\n📊 Targets by organization:")
         for org_name, count in sorted(org_counts.items()):
@@ -915,9 +1264,7 @@ def validate_arguments(args, logger):
         log_error_and_exit(f"❌ Error: {ve}", logger)
 
     validate_file_exists(args.csv_file, logger)
-    validate_positive_integer(args.limit, "--limit", logger)
-    validate_positive_integer(args.max_workers, "--max-workers", logger)
-    validate_positive_integer(args.rate_limit, "--rate-limit", logger)
+    validate_positive_integers({"--limit": args.limit, "--max-workers": args.max_workers, "--rate-limit": args.rate_limit}, logger)
         
     valid_sources = ['github', 'github-cloud-app', 'github-enterprise', 'gitlab', 'azure-repos']
     if args.source not in valid_sources:
@@ -942,7 +1289,7 @@ def create_argument_parser():
     parser.add_argument('--limit', type=int, help='Maximum number of repository targets to process (useful for batching large datasets)')
     parser.add_argument('--branch', help='Override branch for all repositories (default: auto-detect from CSV or repository API)')
     parser.add_argument('--files', help='Override files for all repositories - comma-separated list of file paths to scan (if not specified, files field is omitted from import data)')
-    parser.add_argument('--exclusion-globs', help='Override exclusionGlobs for all repositories (default: "fixtures, tests, __tests__, node_modules")')
+    parser.add_argument('--exclusion-globs', help=f'Override exclusionGlobs for all repositories (default: "{DEFAULT_EXCLUSION_GLOBS}")')
     
     # Performance and scaling options (optional - auto-tuned by default)
     parser.add_argument('--max-workers', type=int, help='Maximum number of concurrent workers for API requests (default: auto-tuned based on repository count)')
@@ -1018,6 +1365,8 @@ def main():
         logger.error(error_msg)
         logger.error("=== create_targets failed ===")
         sys.exit(1)
+    finally:
+        mapper.close()
 
 
 if __name__ == '__main__':
@@ -1,70 +1,163 @@
 import os
 import time
 import requests
+from requests.adapters import HTTPAdapter
 import base64
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 from typing import Dict, Optional
 from src.logging_utils import log_api_request, log_api_response, log_retry_attempt, log_error_with_context
 
-def rate_limit(request_lock, last_request_time, request_interval):
-	"""Apply rate limiting to API requests."""
-	with request_lock:
-		current_time = time.time()
-		time_since_last_request = current_time - last_request_time[0]
-		if time_since_last_request < request_interval:
-			sleep_time = request_interval - time_since_last_request
+try:
+	import orjson
+	ORJSON_AVAILABLE = True
+except ImportError:
+	ORJSON_AVAILABLE = False
+
+class TokenBucket:
+	"""Thread-safe token bucket rate limiter.
+
+	Allows bursts of up to capacity requests and refills at the configured
+	requests-per-minute rate. The lock only covers the token
+	accounting: a caller that finds the bucket empty reserves its token (the
+	balance goes negative) and sleeps outside the lock.
+	"""
+
+	def __init__(self, requests_per_minute: float, capacity: int = 1):
+		self.refill_rate = requests_per_minute / 60.0
+		self.capacity = max(1, capacity)
+		self.tokens = float(self.capacity)
+		self.last_refill = time.monotonic()
+		self._lock = threading.Lock()
+
+	def acquire(self, cost: int = 1) -> None:
+		"""Take cost tokens, sleeping until they have been refilled if the bucket is short."""
+		with self._lock:
+			now = time.monotonic()
+			self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+			self.last_refill = now
+			self.tokens -= cost
+			sleep_time = -self.tokens / self.refill_rate if self.tokens < 0 else 0
+		if sleep_time > 0:
 			time.sleep(sleep_time)
-		last_request_time[0] = time.time()
 
-def get_auth_headers(scm_type: str, source_type: str = None, logger=None) -> Optional[Dict[str, str]]:
-	"""Get authentication headers for SCM APIs based on environment variables."""
+# Environment variable holding the API token for each SCM type
+SCM_TOKEN_ENV_VARS = {
+	'github': 'GITHUB_TOKEN',
+	'gitlab': 'GITLAB_TOKEN',
+	'azure': 'AZURE_DEVOPS_TOKEN',
+}
+
+def _build_auth_headers(scm_type: str, token: str) -> Dict[str, str]:
+	"""Build the auth header dict for a token."""
 	if scm_type == 'github':
-		token = os.getenv('GITHUB_TOKEN')
-		if token:
-			return {'Authorization': f'token {token}'}
-	elif scm_type == 'gitlab':
-		token = os.getenv('GITLAB_TOKEN')
-		if token:
-			return {'PRIVATE-TOKEN': token}
-	elif scm_type == 'azure':
-		token = os.getenv('AZURE_DEVOPS_TOKEN')
-		if token:
-			auth_string = f":{token}"
-			encoded_auth = base64.b64encode(auth_string.encode()).decode()
-			return {'Authorization': f'Basic {encoded_auth}'}
-	return None
+		return {'Authorization': f'token {token}'}
+	if scm_type == 'gitlab':
+		return {'PRIVATE-TOKEN': token}
+	auth_string = f":{token}"
+	encoded_auth = base64.b64encode(auth_string.encode()).decode()
+	return {'Authorization': f'Basic {encoded_auth}'}
+
+def get_auth_headers(scm_type: str, source_type: str = None, logger=None) -> Optional[Dict[str, str]]:
+	"""Get authentication headers for SCM APIs based on environment variables.
+
+	The token is read on every call, so a changed environment variable takes effect
+	immediately. SnykTargetMapper caches the result for the length of a run.
+	"""
+	env_var = SCM_TOKEN_ENV_VARS.get(scm_type)
+	token = os.getenv(env_var) if env_var else None
+	if not token:
+		return None
+	return _build_auth_headers(scm_type, token)
+
+# Status line shown per SCM when its token is missing
+SCM_AUTH_STATUS = (
+	('github', 'GitHub', 'Unauthenticated (60 req/hour limit)'),
+	('gitlab', 'GitLab', 'Unauthenticated (10 req/min limit)'),
+	('azure', 'Azure DevOps', 'No authentication (API calls disabled)'),
+)
 
 def display_auth_status(source_type: str):
 	"""Display authentication status for SCM APIs."""
 	print("🔐 SCM Authentication Status:")
-	github_token = os.getenv('GITHUB_TOKEN')
-	if github_token:
-		print("  ✅ GitHub: Authenticated (GITHUB_TOKEN found)")
-	else:
-		print("  ⚠️  GitHub: Unauthenticated (60 req/hour limit)")
-	gitlab_token = os.getenv('GITLAB_TOKEN')
-	if gitlab_token:
-		print("  ✅ GitLab: Authenticated (GITLAB_TOKEN found)")
-	else:
-		print("  ⚠️  GitLab: Unauthenticated (10 req/min limit)")
-	azure_token = os.getenv('AZURE_DEVOPS_TOKEN')
-	if azure_token:
-		print("  ✅ Azure DevOps: Authenticated (AZURE_DEVOPS_TOKEN found)")
-	else:
-		print("  ⚠️  Azure DevOps: No authentication (API calls disabled)")
+	for scm_type, label, missing_message in SCM_AUTH_STATUS:
+		env_var = SCM_TOKEN_ENV_VARS[scm_type]
+		if os.getenv(env_var):
+			print(f"  ✅ {label}: Authenticated ({env_var} found)")
+		else:
+			print(f"  ⚠️  {label}: {missing_message}")
 	print()
 
-def make_request_with_retry(url: str, max_retries: int, retry_delay: int, retry_backoff: int, rate_limit_fn, headers: Optional[Dict[str, str]] = None, logger=None, timeout: int = 10) -> Optional[requests.Response]:
-	"""Make HTTP request with exponential backoff retry logic and detailed logging."""
+def parse_json_response(response: requests.Response):
+	"""Decode a JSON response body, using orjson when it is installed.
+
+	Raises ValueError for a body that is not valid JSON, as response.json() does.
+	"""
+	if ORJSON_AVAILABLE:
+		return orjson.loads(response.content)
+	return response.json()
+
+# Distinct SCM API hosts a run talks to (GitHub, GitLab, Azure DevOps, a self-hosted instance)
+SESSION_HOST_POOLS = 4
+
+def create_session(pool_size: int = 10) -> requests.Session:
+	"""Create an HTTP session whose connection pool can keep one connection alive per worker."""
+	session = requests.Session()
+	# Retries are handled by make_request_with_retry, so the adapter must not retry on its own
+	adapter = HTTPAdapter(pool_connections=SESSION_HOST_POOLS, pool_maxsize=pool_size, max_retries=0)
+	session.mount('http://', adapter)
+	session.mount('https://', adapter)
+	return session
+
+# Upper bound for a single retry wait, whether computed or requested by the server
+MAX_RETRY_WAIT = 60
+
+def _jittered_wait(base_wait: float) -> float:
+	"""Spread a backoff wait over 50-150% of its value so concurrent workers don't retry in lockstep."""
+	return min(MAX_RETRY_WAIT, base_wait * random.uniform(0.5, 1.5))
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+	"""Parse a Retry-After header (delta-seconds or HTTP date) into seconds, or None if absent/invalid."""
+	value = response.headers.get('Retry-After')
+	if not isinstance(value, str) or not value.strip():
+		return None
+	value = value.strip()
+	if value.isdigit():
+		seconds = float(value)
+	else:
+		try:
+			retry_at = parsedate_to_datetime(value)
+		except (TypeError, ValueError):
+			return None
+		if retry_at.tzinfo is None:
+			retry_at = retry_at.replace(tzinfo=timezone.utc)
+		seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+	return min(MAX_RETRY_WAIT, max(0.0, seconds))
+
+def make_request_with_retry(url: str, max_retries: int, retry_delay: int, retry_backoff: int, rate_limit_fn, headers: Optional[Dict[str, str]] = None, logger=None, timeout: int = 10, session: Optional[requests.Session] = None, json_body: Optional[Dict] = None) -> Optional[requests.Response]:
+	"""Make HTTP request with exponential backoff retry logic and detailed logging.
+
+	Backoff waits are jittered and capped at MAX_RETRY_WAIT; a 429 with Retry-After waits as instructed.
+	Pass a session to reuse keep-alive connections across requests.
+	Requests are GETs unless json_body is given, in which case it is POSTed (e.g. GraphQL queries).
+	"""
+	http = session or requests
+	method = 'GET' if json_body is None else 'POST'
 	# Log the initial request details
 	if logger:
-		log_api_request(logger, 'GET', url, headers)
+		log_api_request(logger, method, url, headers)
 	for attempt in range(max_retries):
 		try:
 			rate_limit_fn()
 			
 			# Track response time
 			start_time = time.time()
-			response = requests.get(url, timeout=timeout, headers=headers)
+			if json_body is None:
+				response = http.get(url, timeout=timeout, headers=headers)
+			else:
+				response = http.post(url, json=json_body, timeout=timeout, headers=headers)
 			response_time = time.time() - start_time
 			
 			# Log response details
@@ -77,8 +170,11 @@ def make_request_with_retry(url: str, max_retries: int, retry_delay: int, retry_
 					logger.debug(f"✅ Successful API call to {url}")
 				return response
 			elif response.status_code == 429:
-				wait_time = retry_delay * (retry_backoff ** attempt) * 2
-				warning_msg = f"Rate limit hit for {url}, waiting {wait_time}s before retry {attempt + 1}/{max_retries}"
+				# Prefer the server's own Retry-After over a guessed backoff
+				wait_time = _retry_after_seconds(response)
+				if wait_time is None:
+					wait_time = _jittered_wait(retry_delay * (retry_backoff ** attempt) * 2)
+				warning_msg = f"Rate limit hit for {url}, waiting {wait_time:.1f}s before retry {attempt + 1}/{max_retries}"
 				print(f"⚠️  {warning_msg}")
 				if logger:
 					log_retry_attempt(logger, attempt + 1, max_retries, url, wait_time)
@@ -93,8 +189,8 @@ def make_request_with_retry(url: str, max_retries: int, retry_delay: int, retry_
 					logger.debug(f"Error response body: {response.text[:500]}...")
 				return None
 			elif response.status_code >= 500:
-				wait_time = retry_delay * (retry_backoff ** attempt)
-				warning_msg = f"Server error {response.status_code} for {url}, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})"
+				wait_time = _jittered_wait(retry_delay * (retry_backoff ** attempt))
+				warning_msg = f"Server error {response.status_code} for {url}, retrying in {wait_time:.1f}s (attempt {attempt + 1}/{max_retries})"
 				print(f"⚠️  {warning_msg}")
 				if logger:
 					log_retry_attempt(logger, attempt + 1, max_retries, url, wait_time)
@@ -103,8 +199,8 @@ def make_request_with_retry(url: str, max_retries: int, retry_delay: int, retry_
 					time.sleep(wait_time)
 				continue
 		except requests.exceptions.RequestException as e:
-			wait_time = retry_delay * (retry_backoff ** attempt)
-			error_msg = f"Request exception for {url}: {e}, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})"
+			wait_time = _jittered_wait(retry_delay * (retry_backoff ** attempt))
+			error_msg = f"Request exception for {url}: {e}, retrying in {wait_time:.1f}s (attempt {attempt + 1}/{max_retries})"
 			print(f"⚠️  {error_msg}")
 			if logger:
 				log_error_with_context(logger, f"Request exception for {url}", e)
@@ -1,5 +1,5 @@
 import csv
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional
 
 try:
     import pandas as pd
@@ -7,72 +7,137 @@ try:
 except ImportError:
     PANDAS_AVAILABLE = False
 
+try:
+    import pyarrow
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Columns read from the Snyk "All Assets" export
+# 'Default Branch' is optional and not part of the export; add it to set a repository's branch
+CSV_COLUMNS = ['Application', 'Type', 'Asset', 'Repository URL', 'Asset Source', 'Organizations', 'Default Branch']
+REQUIRED_COLUMNS = ['Application', 'Type']
+# Rows per pandas chunk - large exports are filtered chunk by chunk instead of loaded whole
+CSV_CHUNK_SIZE = 100_000
+# Read buffer for the csv module fallback - fewer read() calls and larger UTF-8 decode blocks
+CSV_READ_BUFFER_SIZE = 1 << 20
+# Application values (lowercased) that mean "no application assigned"
+INVALID_APP_NAMES = frozenset({'nan', 'n/a', '', 'none', 'null'})
+# Output field name for each CSV column
+FIELD_NAMES = {
+    'Type': 'asset_type',
+    'Asset': 'asset_name',
+    'Repository URL': 'repository_url',
+    'Asset Source': 'asset_source',
+    'Organizations': 'organizations',
+    'Default Branch': 'default_branch'
+}
+
+def _has_required_columns(columns: Optional[Iterable[str]], logger=None) -> bool:
+    """Check the CSV header contains the columns needed to map repositories to applications"""
+    columns = set(columns) if columns is not None else set()
+    for column in REQUIRED_COLUMNS:
+        if column not in columns:
+            msg = f"Error: '{column}' column not found in CSV"
+            if logger: logger.error(msg)
+            return False
+    return True
+
+def _row_to_apps(row: Dict[str, str], index: int) -> List[Dict]:
+    """
+    Convert a single CSV row into one application entry per listed Application
+    Returns an empty list for non-repository rows or rows without a valid Application
+    Entries also carry lowercased/stripped repository_url_norm and asset_source_norm fields
+    """
+    # Only process rows where Type='repository'
+    asset_type = row.get("Type") or ""
+    if asset_type.strip().lower() != 'repository':
+        return []
+
+    app_name = (row.get("Application") or "").strip()
+    if not app_name or app_name.lower() in INVALID_APP_NAMES:
+        return []
+
+    # '' is in INVALID_APP_NAMES, so blank names are dropped by the same set lookup
+    app_names = [name for name in (part.strip() for part in app_name.split(',')) if name.lower() not in INVALID_APP_NAMES]
+    repository_url = row.get("Repository URL") or ""
+    asset_source = row.get("Asset Source") or ""
+    return [
+        {
+            'application_name': single_app,
+            'asset_type': asset_type,
+            'asset_name': row.get("Asset") or "",
+            'repository_url': repository_url,
+            'asset_source': asset_source,
+            'organizations': row.get("Organizations") or "",
+            'default_branch': row.get("Default Branch") or "",
+            'row_index': index,
+            'repository_url_norm': repository_url.lower().strip(),
+            'asset_source_norm': asset_source.lower().strip()
+        }
+        for single_app in app_names
+    ]
+
+def _dataframe_to_apps(df) -> List[Dict]:
+    """
+    Vectorized equivalent of _row_to_apps over a whole DataFrame
+    Filters repository rows with boolean masks and explodes comma-separated Applications
+    """
+    # Cells are already read as strings with no NA inference; only absent columns need filling
+    df = df.reindex(columns=CSV_COLUMNS, fill_value='')
+    app_col = df['Application'].str.strip()
+    mask = df['Type'].str.strip().str.lower().eq('repository') & ~app_col.str.lower().isin(INVALID_APP_NAMES)
+    if not mask.any():
+        return []
+
+    # One entry per comma-separated application name, keeping the source row index
+    app_names = app_col[mask].str.split(',').explode().str.strip()
+    app_names = app_names[~app_names.str.lower().isin(INVALID_APP_NAMES)]
+
+    result = df.loc[app_names.index, list(FIELD_NAMES)].rename(columns=FIELD_NAMES)
+    result.insert(0, 'application_name', app_names.values)
+    result['row_index'] = app_names.index
+    # Lowercased/stripped copies for source-type matching, computed once per column
+    result['repository_url_norm'] = result['repository_url'].str.lower().str.strip()
+    result['asset_source_norm'] = result['asset_source'].str.lower().str.strip()
+    return result.to_dict('records')
+
+def _read_header(csv_file_path: str) -> Optional[List[str]]:
+    """Read only the header row of a CSV file (None for an empty file)"""
+    with open(csv_file_path, 'r', newline='', encoding='utf-8-sig') as csvfile:
+        return next(csv.reader(csvfile), None)
+
 def read_applications_from_csv(csv_file_path: str, logger=None) -> List[Dict]:
     """
     Read applications from CSV file with enhanced parsing
     Only processes rows where Type='repository'
     """
     applications = []
+    use_pandas = PANDAS_AVAILABLE
     try:
-        if PANDAS_AVAILABLE:
-            df = pd.read_csv(csv_file_path)
-            if 'Application' not in df.columns:
-                msg = "Error: 'Application' column not found in CSV"
-                if logger: logger.error(msg)
+        if use_pandas:
+            # Validate the header before parsing any rows, and decode only the columns we use
+            header = _read_header(csv_file_path)
+            if not _has_required_columns(header, logger):
                 return []
-            if 'Type' not in df.columns:
-                msg = "Error: 'Type' column not found in CSV"
-                if logger: logger.error(msg)
-                return []
-            for index, row in df.iterrows():
-                # Only process rows where Type='repository'
-                asset_type = str(row.get("Type", "")).strip()
-                if asset_type.lower() != 'repository':
-                    continue
-                
-                app_name = str(row.get("Application", "")).strip()
-                if app_name and app_name.lower() not in ['nan', 'n/a', '', 'none', 'null']:
-                    app_names = [name.strip() for name in app_name.split(',') if name.strip() and name.strip().lower() not in ['n/a', 'nan', '', 'none', 'null']]
-                    for single_app in app_names:
-                        applications.append({
-                            'application_name': single_app,
-                            'asset_type': str(row.get("Type", "")),
-                            'asset_name': str(row.get("Asset", "")),
-                            'repository_url': str(row.get("Repository URL", "")),
-                            'asset_source': str(row.get("Asset Source", "")),
-                            'organizations': str(row.get("Organizations", "")),
-                            'row_index': index
-                        })
+            usecols = [column for column in CSV_COLUMNS if column in header]
+        if use_pandas and PYARROW_AVAILABLE:
+            # Arrow's multi-threaded parser
+            # Cells stay plain strings: no NA inference, so 'N/A'/'null' read exactly as the csv module does
+            df = pd.read_csv(csv_file_path, engine='pyarrow', usecols=usecols, dtype=str, keep_default_na=False)
+            applications = _dataframe_to_apps(df)
+        elif use_pandas:
+            # Only the filtered repository rows of each chunk are kept in memory
+            with pd.read_csv(csv_file_path, chunksize=CSV_CHUNK_SIZE, usecols=usecols, dtype=str, keep_default_na=False) as reader:
+                for chunk in reader:
+                    applications.extend(_dataframe_to_apps(chunk))
         else:
-            with open(csv_file_path, 'r', newline='', encoding='utf-8') as csvfile:
+            with open(csv_file_path, 'r', newline='', encoding='utf-8', buffering=CSV_READ_BUFFER_SIZE) as csvfile:
                 reader = csv.DictReader(csvfile)
-                if 'Application' not in reader.fieldnames:
-                    msg = "Error: 'Application' column not found in CSV"
-                    if logger: logger.error(msg)
-                    return []
-                if 'Type' not in reader.fieldnames:
-                    msg = "Error: 'Type' column not found in CSV"
-                    if logger: logger.error(msg)
+                if not _has_required_columns(reader.fieldnames, logger):
                     return []
                 for index, row in enumerate(reader):
-                    # Only process rows where Type='repository'
-                    asset_type = row.get("Type", "").strip()
-                    if asset_type.lower() != 'repository':
-                        continue
-                    
-                    app_name = row.get("Application", "").strip()
-                    if app_name and app_name.lower() not in ['nan', 'n/a', '', 'none', 'null']:
-                        app_names = [name.strip() for name in app_name.split(',') if name.strip() and name.strip().lower() not in ['n/a', 'nan', '', 'none', 'null']]
-                        for single_app in app_names:
-                            applications.append({
-                                'application_name': single_app,
-                                'asset_type': row.get("Type", ""),
-                                'asset_name': row.get("Asset", ""),
-                                'repository_url': row.get("Repository URL", ""),
-                                'asset_source': row.get("Asset Source", ""),
-                                'organizations': row.get("Organizations", ""),
-                                'row_index': index
-                            })
+                    applications.extend(_row_to_apps(row, index))
     except Exception as e:
         if logger: logger.error(f"Error reading CSV file: {e}")
         return []
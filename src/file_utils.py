@@ -4,6 +4,24 @@ import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _is_plain_filename(path: str) -> bool:
+    """Check for a bare filename that normpath would return unchanged and that cannot traverse"""
+    return bool(path) and '/' not in path and '\\' not in path and '..' not in path and not path.startswith('.')
+
+
+def _has_parent_reference(norm_path: str) -> bool:
+    """Check a normalized path for a '..' component without splitting it into a list"""
+    sep = os.sep
+    return (norm_path == '..' or norm_path.startswith('..' + sep) or norm_path.endswith(sep + '..')
+            or (sep + '..' + sep) in norm_path)
+
 
 def sanitize_path(path: str) -> str:
     """
@@ -18,9 +36,13 @@ def sanitize_path(path: str) -> str:
     Raises:
         ValueError: If path is unsafe (absolute or contains path traversal)
     """
-    if os.path.isabs(path) or '..' in os.path.normpath(path).split(os.sep):
+    # Fast path for the common bare output filename
+    if _is_plain_filename(path):
+        return path
+    norm_path = os.path.normpath(path)
+    if os.path.isabs(path) or _has_parent_reference(norm_path):
         raise ValueError(f"Unsafe file path detected: {path}")
-    return os.path.normpath(path)
+    return norm_path
 
 
 def sanitize_input_path(path: str) -> str:
@@ -36,10 +58,13 @@ def sanitize_input_path(path: str) -> str:
     Raises:
         ValueError: If path contains directory traversal attempts
     """
+    if _is_plain_filename(path):
+        return path
     # Allow absolute paths for input files, but prevent directory traversal
-    if '..' in os.path.normpath(path).split(os.sep):
+    norm_path = os.path.normpath(path)
+    if _has_parent_reference(norm_path):
         raise ValueError(f"Unsafe file path detected (directory traversal): {path}")
-    return os.path.normpath(path)
+    return norm_path
 
 
 def safe_write_json(data: Dict[str, Any], output_path: str, logger=None) -> None:
@@ -58,92 +83,145 @@ def safe_write_json(data: Dict[str, Any], output_path: str, logger=None) -> None
     # Sanitize path for security
     safe_output_path = sanitize_path(output_path)
     
+    # Serialized up front and written with a single write call
+    write_json_file(data, safe_output_path, logger)
+
+
+def serialize_json(data: Dict[str, Any]) -> bytes:
+    """
+    Serialize data as 2-space indented JSON, using orjson when it is installed
+    
+    Args:
+        data: Dictionary data to serialize
+        
+    Returns:
+        UTF-8 encoded JSON document
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _write_output_file(output_path: str, write_fn, logger=None) -> None:
+    """
+    Write output_path via write_fn atomically and report the outcome
+    The content goes to a sibling .tmp file that is renamed over output_path only once complete,
+    so a crash or write error never leaves a truncated output file behind
+    
+    Raises:
+        SystemExit: On any file writing error
+    """
+    tmp_path = output_path + '.tmp'
     try:
-        with open(safe_output_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        try:
+            with open(tmp_path, 'wb') as f:
+                write_fn(f)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
         
-        success_msg = f"📄 Created file: {safe_output_path}"
+        success_msg = f"📄 Created file: {output_path}"
         print(success_msg)
         if logger:
             logger.info(success_msg)
             
     except PermissionError:
-        error_msg = f"❌ Error: Permission denied writing to {safe_output_path}"
-        print(error_msg)
-        if logger:
-            logger.error(error_msg)
-        sys.exit(1)
+        error_msg = f"❌ Error: Permission denied writing to {output_path}"
+        log_error_and_exit(error_msg, logger)
     except OSError as e:
-        error_msg = f"❌ Error: Failed to write file {safe_output_path}: {e}"
-        print(error_msg)
-        if logger:
-            logger.error(error_msg)
-        sys.exit(1)
+        error_msg = f"❌ Error: Failed to write file {output_path}: {e}"
+        log_error_and_exit(error_msg, logger)
     except Exception as e:
-        error_msg = f"❌ Error: Unexpected error writing file {safe_output_path}: {e}"
-        print(error_msg)
-        if logger:
-            logger.error(error_msg)
-        sys.exit(1)
+        error_msg = f"❌ Error: Unexpected error writing file {output_path}: {e}"
+        log_error_and_exit(error_msg, logger)
 
 
-def build_output_path_in_logs(filename: str, logger=None) -> str:
+def write_json_file(data: Dict[str, Any], output_path: str, logger=None) -> None:
     """
-    Build an output file path in the SNYK_LOG_PATH directory.
-    Validates that the directory exists and sanitizes the filename to prevent path traversal attacks.
+    Write JSON data to an already validated output path with comprehensive error handling
     
     Args:
-        filename: The filename to create in the logs directory (will be sanitized)
-        logger: Optional logger for messages
-        
-    Returns:
-        Full path where the file should be written
+        data: Dictionary data to write as JSON
+        output_path: Output file path (must already be sanitized by the caller)
+        logger: Optional logger for error reporting
         
     Raises:
-        SystemExit: If SNYK_LOG_PATH environment variable is not set, directory doesn't exist,
-                   or filename contains path traversal attempts
+        SystemExit: On any file writing error
     """
-    snyk_log_path = os.environ.get('SNYK_LOG_PATH')
+    _write_output_file(output_path, lambda f: f.write(serialize_json(data)), logger)
+
+
+# Validated SNYK_LOG_PATH directories, keyed by the raw environment variable value
+_LOG_DIR_CACHE: Dict[str, Path] = {}
+
+
+def clear_log_dir_cache() -> None:
+    """Forget previously validated SNYK_LOG_PATH directories"""
+    _LOG_DIR_CACHE.clear()
+
+
+def _validate_log_dir(snyk_log_path: str, logger=None) -> Path:
+    """
+    Resolve SNYK_LOG_PATH and check it is an existing, writable directory
+    Successful results are cached so later calls skip the resolve/stat/access syscalls
     
-    if not snyk_log_path:
-        error_msg = "❌ Error: SNYK_LOG_PATH environment variable is required but not set. Please set it to your desired logs directory and re-run."
-        print(error_msg)
-        if logger:
-            logger.error(error_msg)
-        sys.exit(1)
+    Raises:
+        SystemExit: If the directory is invalid, missing, not a directory or not writable
+    """
+    log_dir = _LOG_DIR_CACHE.get(snyk_log_path)
+    if log_dir is not None:
+        return log_dir
     
     # Validate and normalize the log directory path
     try:
         log_dir = Path(snyk_log_path).resolve()
     except Exception as e:
         error_msg = f"❌ Error: Invalid SNYK_LOG_PATH '{snyk_log_path}': {e}"
-        print(error_msg)
-        if logger:
-            logger.error(error_msg)
-        sys.exit(1)
+        log_error_and_exit(error_msg, logger)
     
     # Check if the directory exists
     if not log_dir.exists():
         error_msg = f"❌ Error: SNYK_LOG_PATH directory '{log_dir}' does not exist. Please create the directory first and re-run."
-        print(error_msg)
-        if logger:
-            logger.error(error_msg)
-        sys.exit(1)
+        log_error_and_exit(error_msg, logger)
     
     if not log_dir.is_dir():
         error_msg = f"❌ Error: SNYK_LOG_PATH '{log_dir}' is not a directory. Please set it to a valid directory path and re-run."
-        print(error_msg)
-        if logger:
-            logger.error(error_msg)
-        sys.exit(1)
+        log_error_and_exit(error_msg, logger)
     
     # Check if directory is writable
     if not os.access(str(log_dir), os.W_OK):
         error_msg = f"❌ Error: SNYK_LOG_PATH directory '{log_dir}' is not writable. Please check permissions and re-run."
-        print(error_msg)
-        if logger:
-            logger.error(error_msg)
-        sys.exit(1)
+        log_error_and_exit(error_msg, logger)
+    
+    _LOG_DIR_CACHE[snyk_log_path] = log_dir
+    return log_dir
+
+
+def build_output_path_in_logs(filename: str, logger=None) -> str:
+    """
+    Build an output file path in the SNYK_LOG_PATH directory.
+    Validates that the directory exists and sanitizes the filename to prevent path traversal attacks.
+    
+    Args:
+        filename: The filename to create in the logs directory (will be sanitized)
+        logger: Optional logger for messages
+        
+    Returns:
+        Full path where the file should be written
+        
+    Raises:
+        SystemExit: If SNYK_LOG_PATH environment variable is not set, directory doesn't exist,
+                   or filename contains path traversal attempts
+    """
+    snyk_log_path = os.environ.get('SNYK_LOG_PATH')
+    
+    if not snyk_log_path:
+        error_msg = "❌ Error: SNYK_LOG_PATH environment variable is required but not set. Please set it to your desired logs directory and re-run."
+        log_error_and_exit(error_msg, logger)
+    
+    log_dir = _validate_log_dir(snyk_log_path, logger)
     
     # Sanitize filename to prevent path traversal attacks
     try:
@@ -154,19 +232,12 @@ def build_output_path_in_logs(filename: str, logger=None) -> str:
         if not safe_filename or safe_filename in ('.', '..') or '/' in safe_filename or '\\' in safe_filename:
             raise ValueError(f"Invalid filename: {filename}")
         
-        # Build the output path
+        # A bare name with no separators cannot escape log_dir, so the join needs no second resolve()
         output_path = log_dir / safe_filename
-        
-        # Final security check - ensure the resolved path is still within the log directory
-        if not str(output_path.resolve()).startswith(str(log_dir)):
-            raise ValueError(f"Path traversal attempt detected in filename: {filename}")
             
     except Exception as e:
         error_msg = f"❌ Error: Invalid filename '{filename}': {e}"
-        print(error_msg)
-        if logger:
-            logger.error(error_msg)
-        sys.exit(1)
+        log_error_and_exit(error_msg, logger)
     
     if logger:
         logger.info(f"Using SNYK_LOG_PATH for output: {output_path}")
@@ -187,33 +258,8 @@ def safe_write_json_to_logs(data: Dict[str, Any], filename: str, logger=None) ->
     """
     output_path = build_output_path_in_logs(filename, logger)
     
-    try:
-        with open(output_path, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        success_msg = f"📄 Created file: {output_path}"
-        print(success_msg)
-        if logger:
-            logger.info(success_msg)
-            
-    except PermissionError:
-        error_msg = f"❌ Error: Permission denied writing to {output_path}"
-        print(error_msg)
-        if logger:
-            logger.error(error_msg)
-        sys.exit(1)
-    except OSError as e:
-        error_msg = f"❌ Error: Failed to write file {output_path}: {e}"
-        print(error_msg)
-        if logger:
-            logger.error(error_msg)
-        sys.exit(1)
-    except Exception as e:
-        error_msg = f"❌ Error: Unexpected error writing file {output_path}: {e}"
-        print(error_msg)
-        if logger:
-            logger.error(error_msg)
-        sys.exit(1)
+    # Serialized up front and written with a single write call
+    write_json_file(data, output_path, logger)
 
 
 def validate_file_exists(file_path: str, logger=None) -> None:
@@ -229,10 +275,7 @@ def validate_file_exists(file_path: str, logger=None) -> None:
     """
     if not os.path.exists(file_path):
         error_msg = f"❌ Error: File not found: {file_path}"
-        print(error_msg)
-        if logger:
-            logger.error(error_msg)
-        sys.exit(1)
+        log_error_and_exit(error_msg, logger)
 
 
 def log_error_and_exit(message: str, logger=None, exit_code: int = 1) -> None:
@@ -282,3 +325,37 @@ def validate_non_empty_string(value: str, field_name: str, logger=None) -> None:
     if not value or len(value.strip()) == 0:
         error_msg = f"❌ Error: {field_name} cannot be empty"
         log_error_and_exit(error_msg, logger)
+
+
+def validate_positive_integers(fields: Dict[str, Optional[int]], logger=None) -> None:
+    """
+    Validate several optional positive integers, reporting every invalid field at once
+    
+    Args:
+        fields: Mapping of field name (for error messages) to value; None values are skipped
+        logger: Optional logger for error reporting
+        
+    Raises:
+        SystemExit: If any value is not positive
+    """
+    errors = [f"❌ Error: {field_name} must be a positive integer, got: {value}"
+              for field_name, value in fields.items() if value is not None and value <= 0]
+    if errors:
+        log_error_and_exit("\n".join(errors), logger)
+
+
+def validate_non_empty_strings(fields: Dict[str, Optional[str]], logger=None) -> None:
+    """
+    Validate several string values are not empty, reporting every invalid field at once
+    
+    Args:
+        fields: Mapping of field name (for error messages) to value
+        logger: Optional logger for error reporting
+        
+    Raises:
+        SystemExit: If any value is empty
+    """
+    errors = [f"❌ Error: {field_name} cannot be empty"
+              for field_name, value in fields.items() if not value or not value.strip()]
+    if errors:
+        log_error_and_exit("\n".join(errors), logger)
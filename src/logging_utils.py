@@ -1,44 +1,75 @@
 import logging
+import logging.handlers
 import os
 import sys
 import traceback
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional, Set, Tuple
+
+# (debug, SNYK_LOG_PATH) each logger was last configured with, so repeat calls can reuse it
+# (SNYK_LOG_PATH is recorded as None for disabled loggers)
+_logger_configs: Dict[str, Tuple[bool, Optional[str]]] = {}
+# Log directories already created by this process
+_created_log_dirs: Set[str] = set()
+# Formatters are stateless, so every handler shares these instances
+_DETAILED_FORMATTER = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s')
+_CONSOLE_FORMATTER = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+# Debug log records buffered before a batched write to the log file (ERROR and above flush at once)
+LOG_FILE_BUFFER_CAPACITY = 512
+# Request headers (lowercased) whose values are masked in debug logs
+SENSITIVE_HEADERS = frozenset({'authorization', 'x-snyk-token', 'private-token'})
 
 def setup_logging(name: str = 'create_targets', debug: bool = False) -> logging.Logger:
     """
     Setup logging - only produces logs when debug=True
+    Calling again with the same name and settings returns the already configured logger
+    (no new log file or handlers)
     
     Args:
         name: Logger name
         debug: Enable enhanced DEBUG logging. If False, no logs are produced.
     """
     logger = logging.getLogger(name)
-    
-    # Clear any existing handlers
+    # SNYK_LOG_PATH is read once per call and reused below; a disabled logger does not depend on it
+    log_path = os.environ.get('SNYK_LOG_PATH') if debug else None
+    config = (debug, log_path)
+    if logger.handlers and _logger_configs.get(name) == config:
+        return logger
+    _logger_configs[name] = config
+    
+    # Flush and close the previous handlers before dropping them so buffered debug records are
+    # written out and the old log file is released
+    for handler in list(logger.handlers):
+        # A MemoryHandler drops its reference to the file handler on close, so take it first
+        target = getattr(handler, 'target', None)
+        handler.flush()
+        handler.close()
+        if target is not None:
+            target.close()
     logger.handlers.clear()
     
     if not debug:
         # No logging when debug is False - set level very high so nothing gets logged
         logger.setLevel(logging.CRITICAL + 1)  # Higher than any standard level
-        # Add a null handler to prevent propagation
+        # Add a null handler and stop propagation so nothing reaches the root logger's handlers
         logger.addHandler(logging.NullHandler())
+        logger.propagate = False
         return logger
+    logger.propagate = True
     
     # Debug mode enabled - setup enhanced logging
-    log_path = os.environ.get('SNYK_LOG_PATH')
-    
     if not log_path:
         print("Warning: SNYK_LOG_PATH environment variable not set. Debug logs will only be displayed on console.")
         logger.setLevel(logging.DEBUG)
         console_handler = logging.StreamHandler()
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s')
-        console_handler.setFormatter(formatter)
+        console_handler.setFormatter(_DETAILED_FORMATTER)
         logger.addHandler(console_handler)
         return logger
     
     # Setup file and console logging for debug mode
-    os.makedirs(log_path, exist_ok=True)
+    if log_path not in _created_log_dirs:
+        os.makedirs(log_path, exist_ok=True)
+        _created_log_dirs.add(log_path)
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     log_file = os.path.join(log_path, f'{name}_{timestamp}.log')
     
@@ -46,16 +77,14 @@ def setup_logging(name: str = 'create_targets', debug: bool = False) -> logging.
     
     # Enhanced file handler with detailed formatting for debug
     file_handler = logging.FileHandler(log_file)
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s'
-    )
-    file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
+    file_handler.setFormatter(_DETAILED_FORMATTER)
+    # Batch file writes; logging.shutdown() at interpreter exit flushes whatever is still buffered
+    buffered_handler = logging.handlers.MemoryHandler(LOG_FILE_BUFFER_CAPACITY, flushLevel=logging.ERROR, target=file_handler)
+    logger.addHandler(buffered_handler)
     
     # Console handler for debug output (less verbose than file)
     console_handler = logging.StreamHandler()
-    console_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-    console_handler.setFormatter(console_formatter)
+    console_handler.setFormatter(_CONSOLE_FORMATTER)
     logger.addHandler(console_handler)
     
     print(f"📝 Debug logging enabled - writing to: {log_file}")
@@ -70,15 +99,20 @@ def log_error_with_context(logger: logging.Logger, message: str, exception: Opti
         message: Error message
         exception: Exception to log (optional)
     """
-    logger.error(f"❌ {message}")
+    logger.error("❌ %s", message)
+    
+    if exception:
+        logger.error("Exception type: %s", type(exception).__name__)
+        logger.error("Exception message: %s", exception)
     
+    # Formatting a traceback walks every frame, so only do it when the debug record will be emitted
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     if exception:
-        logger.error(f"Exception type: {type(exception).__name__}")
-        logger.error(f"Exception message: {str(exception)}")
-        logger.debug(f"Full stack trace:\n{traceback.format_exc()}")
+        logger.debug("Full stack trace:\n%s", traceback.format_exc())
     else:
         # Log current stack trace if no specific exception
-        logger.debug(f"Stack trace:\n{''.join(traceback.format_stack())}")
+        logger.debug("Stack trace:\n%s", ''.join(traceback.format_stack()))
 
 def log_api_request(logger: logging.Logger, method: str, url: str, headers: Optional[dict] = None):
     """
@@ -90,16 +124,19 @@ def log_api_request(logger: logging.Logger, method: str, url: str, headers: Opti
         url: Request URL
         headers: Request headers (sensitive data will be masked)
     """
-    logger.debug(f"🌐 API Request: {method} {url}")
+    # Formatting is deferred to the logger; the header masking below only runs when DEBUG is enabled
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    logger.debug("🌐 API Request: %s %s", method, url)
     if headers:
         # Mask sensitive headers
         safe_headers = {}
         for key, value in headers.items():
-            if key.lower() in ['authorization', 'x-snyk-token', 'private-token']:
+            if key.lower() in SENSITIVE_HEADERS:
                 safe_headers[key] = f"{value[:10]}..." if len(value) > 10 else "***"
             else:
                 safe_headers[key] = value
-        logger.debug(f"   Headers: {safe_headers}")
+        logger.debug("   Headers: %s", safe_headers)
 
 def log_api_response(logger: logging.Logger, status_code: int, url: str, response_time: float, response_size: Optional[int] = None):
     """
@@ -112,9 +149,11 @@ def log_api_response(logger: logging.Logger, status_code: int, url: str, respons
         response_time: Response time in seconds
         response_size: Response body size in bytes (optional)
     """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     status_emoji = "✅" if 200 <= status_code < 300 else "⚠️" if 300 <= status_code < 500 else "❌"
     size_info = f", {response_size} bytes" if response_size else ""
-    logger.debug(f"🌐 API Response: {status_emoji} {status_code} for {url} ({response_time:.2f}s{size_info})")
+    logger.debug("🌐 API Response: %s %s for %s (%.2fs%s)", status_emoji, status_code, url, response_time, size_info)
 
 def log_retry_attempt(logger: logging.Logger, attempt: int, max_retries: int, url: str, delay: float):
     """
@@ -127,7 +166,7 @@ def log_retry_attempt(logger: logging.Logger, attempt: int, max_retries: int, ur
         url: Request URL
         delay: Delay before retry in seconds
     """
-    logger.warning(f"🔄 Retry {attempt}/{max_retries} for {url} (waiting {delay:.1f}s)")
+    logger.warning("🔄 Retry %d/%d for %s (waiting %.1fs)", attempt, max_retries, url, delay)
 
 def log_progress(logger: logging.Logger, current: int, total: int, item_name: str = "item"):
     """
@@ -139,5 +178,7 @@ def log_progress(logger: logging.Logger, current: int, total: int, item_name: st
         total: Total number of items
         item_name: Name of items being processed
     """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     percentage = (current / total) * 100 if total > 0 else 0
-    logger.debug(f"📊 Progress: {current}/{total} {item_name}s processed ({percentage:.1f}%)")
+    logger.debug("📊 Progress: %d/%d %ss processed (%.1f%%)", current, total, item_name, percentage)
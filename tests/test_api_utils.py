@@ -14,44 +14,51 @@ import requests
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from api import rate_limit, get_auth_headers, display_auth_status, make_request_with_retry
+from api import TokenBucket, get_auth_headers, display_auth_status, make_request_with_retry, create_session, parse_json_response
+import api
 
 
-class TestRateLimit:
-    """Test rate limiting functionality"""
+class TestTokenBucket:
+    """Test token bucket rate limiting"""
     
-    def test_rate_limit_enforced(self):
-        """Test that rate limiting actually delays execution"""
-        # Create rate limit parameters
-        request_lock = threading.Lock()
-        last_request_time = [0.0]  # Mutable container
-        request_interval = 0.5  # 0.5 second interval
+    def test_burst_up_to_capacity_is_immediate(self):
+        """Test that a full bucket serves capacity requests without waiting"""
+        bucket = TokenBucket(60, capacity=5)  # 1 token per second
         
         start_time = time.time()
+        for _ in range(5):
+            bucket.acquire()
         
-        # Make two calls
-        rate_limit(request_lock, last_request_time, request_interval)
-        rate_limit(request_lock, last_request_time, request_interval)
+        assert time.time() - start_time < 0.1
+    
+    def test_empty_bucket_waits_for_refill(self):
+        """Test that requests beyond capacity are spaced at the refill rate"""
+        bucket = TokenBucket(600, capacity=2)  # 10 tokens per second
         
-        elapsed = time.time() - start_time
+        start_time = time.time()
+        for _ in range(4):
+            bucket.acquire()
         
-        # Should have taken at least the request interval
-        assert elapsed >= 0.4  # Allow some tolerance for execution time
+        elapsed = time.time() - start_time
+        # Two burst tokens, then two refills 0.1s apart
+        assert 0.15 <= elapsed < 0.5
     
-    def test_rate_limit_with_zero_interval(self):
-        """Test that zero interval allows rapid requests"""
-        request_lock = threading.Lock()
-        last_request_time = [0.0]
-        request_interval = 0  # No rate limiting
+    def test_concurrent_waiters_sleep_outside_lock(self):
+        """Test that concurrent callers reserve distinct refills and wait in parallel"""
+        bucket = TokenBucket(600, capacity=1)
+        bucket.acquire()  # Drain the burst token
         
         start_time = time.time()
-        
-        # Multiple calls with zero interval should be fast
-        for _ in range(3):
-            rate_limit(request_lock, last_request_time, request_interval)
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
         
         elapsed = time.time() - start_time
-        assert elapsed < 0.1  # Should be very fast
+        # Three refills 0.1s apart: the last caller waits ~0.3s
+        assert 0.25 <= elapsed < 0.6
+        assert not bucket._lock.locked()
 
 
 class TestGetAuthHeaders:
@@ -85,6 +92,17 @@ class TestGetAuthHeaders:
             # Azure uses Basic auth with base64 encoded token
             assert 'Basic' in headers['Authorization']
     
+    def test_get_auth_headers_follows_token_changes(self):
+        """Test that headers reflect the current token rather than one seen earlier"""
+        with patch.dict(os.environ, {'AZURE_DEVOPS_TOKEN': 'first_token'}):
+            first = get_auth_headers('azure')
+        
+        with patch.dict(os.environ, {'AZURE_DEVOPS_TOKEN': 'second_token'}):
+            second = get_auth_headers('azure')
+        
+        assert second is not first
+        assert second['Authorization'] != first['Authorization']
+    
     def test_get_auth_headers_no_token(self):
         """Test behavior when no token is available for the SCM type"""
         # Clear all relevant environment variables
@@ -203,6 +221,48 @@ class TestMakeRequestWithRetry:
                 
                 assert response.status_code == 200
     
+    def test_make_request_honors_retry_after(self):
+        """Test that a 429 with Retry-After waits the server-specified time instead of the backoff"""
+        mock_response_fail = Mock()
+        mock_response_fail.status_code = 429
+        mock_response_fail.headers = {'Retry-After': '7'}
+        
+        mock_response_success = Mock()
+        mock_response_success.status_code = 200
+        
+        with patch('requests.get', side_effect=[mock_response_fail, mock_response_success]):
+            with patch('time.sleep') as mock_sleep:
+                response = make_request_with_retry(
+                    url='https://api.example.com/test',
+                    max_retries=3,
+                    retry_delay=1,
+                    retry_backoff=2,
+                    rate_limit_fn=MagicMock()
+                )
+        
+        assert response.status_code == 200
+        mock_sleep.assert_called_once_with(7.0)
+    
+    def test_make_request_backoff_is_jittered_and_capped(self):
+        """Test that server-error backoff stays within 50-150% of the base wait and under the cap"""
+        mock_response_fail = Mock()
+        mock_response_fail.status_code = 503
+        
+        with patch('requests.get', return_value=mock_response_fail):
+            with patch('time.sleep') as mock_sleep:
+                make_request_with_retry(
+                    url='https://api.example.com/test',
+                    max_retries=4,
+                    retry_delay=1,
+                    retry_backoff=100,
+                    rate_limit_fn=MagicMock()
+                )
+        
+        waits = [call.args[0] for call in mock_sleep.call_args_list]
+        assert len(waits) == 3
+        assert 0.5 <= waits[0] <= 1.5
+        assert all(wait <= api.MAX_RETRY_WAIT for wait in waits)
+    
     def test_make_request_no_retry_on_404(self):
         """Test no retry on client error (404) - should return None"""
         mock_response = Mock()
@@ -266,6 +326,83 @@ class TestMakeRequestWithRetry:
             assert 'headers' in call_kwargs
             assert call_kwargs['headers']['Authorization'] == 'token test123'
 
+    
+    def test_make_request_uses_session(self):
+        """Test that a provided session is used instead of module-level requests.get"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_session = MagicMock()
+        mock_session.get.return_value = mock_response
+        
+        with patch('requests.get') as mock_get:
+            response = make_request_with_retry(
+                url='https://api.example.com/test',
+                max_retries=3,
+                retry_delay=1,
+                retry_backoff=2,
+                rate_limit_fn=MagicMock(),
+                session=mock_session
+            )
+            
+            assert response is mock_response
+            mock_session.get.assert_called_once()
+            mock_get.assert_not_called()
+
+    
+    def test_make_request_posts_json_body(self):
+        """Test that a JSON body switches the request to a POST"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_session = MagicMock()
+        mock_session.post.return_value = mock_response
+        
+        response = make_request_with_retry(
+            url='https://gitlab.com/api/graphql',
+            max_retries=3,
+            retry_delay=1,
+            retry_backoff=2,
+            rate_limit_fn=MagicMock(),
+            session=mock_session,
+            json_body={'query': '{ currentUser { id } }'}
+        )
+        
+        assert response is mock_response
+        mock_session.get.assert_not_called()
+        assert mock_session.post.call_args[1]['json'] == {'query': '{ currentUser { id } }'}
+
+
+class TestParseJsonResponse:
+    """Test JSON response decoding"""
+    
+    def test_parse_json_response_with_and_without_orjson(self):
+        """Test that both decoders return the same data and reject invalid bodies"""
+        response = requests.Response()
+        response._content = b'{"default_branch": "main", "id": 42, "name": "r\\u00e9po"}'
+        invalid = requests.Response()
+        invalid._content = b'<html>Bad gateway</html>'
+        
+        for orjson_available in (True, False):
+            with patch('api.ORJSON_AVAILABLE', orjson_available and api.ORJSON_AVAILABLE):
+                assert parse_json_response(response) == {'default_branch': 'main', 'id': 42, 'name': 'r\u00e9po'}
+                with pytest.raises(ValueError):
+                    parse_json_response(invalid)
+
+
+class TestCreateSession:
+    """Test shared HTTP session creation"""
+    
+    def test_create_session_pool_size(self):
+        """Test that the connection pool is sized for the worker count without adapter retries"""
+        session = create_session(25)
+        try:
+            adapter = session.get_adapter('https://api.github.com')
+            assert adapter._pool_maxsize == 25
+            assert adapter._pool_connections == 4
+            assert adapter.max_retries.total == 0
+            assert session.get_adapter('http://example.com') is adapter
+        finally:
+            session.close()
+
 
 if __name__ == '__main__':
     pytest.main([__file__])
@@ -14,7 +14,17 @@ from unittest.mock import MagicMock, patch, Mock
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from create_targets import SnykTargetMapper
+import requests
+import create_targets
+from create_targets import SnykTargetMapper, build_org_mapping
+
+
+def make_json_response(data, status_code=200):
+    """Build a real requests.Response carrying a JSON body"""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(data).encode('utf-8')
+    return response
 
 
 class TestBranchOverride:
@@ -626,5 +636,475 @@ class TestSourceFiltering:
         assert mapper.should_include_application(github_app, 'github-enterprise')
 
 
+class TestApplicationDeduplication:
+    """Test duplicate CSV entries are collapsed before target creation"""
+
+    def test_duplicate_entries_removed(self):
+        """Test that entries for the same repository and org are processed once"""
+        mapper = SnykTargetMapper("test-group-id")
+
+        applications = [
+            {'application_name': 'App1', 'repository_url': 'https://github.com/user/repo1'},
+            {'application_name': 'App1', 'repository_url': 'https://github.com/user/repo1 '},
+            {'application_name': 'App2', 'repository_url': 'https://github.com/user/repo1'},
+            {'application_name': 'App1', 'repository_url': 'https://github.com/user/repo2'},
+            {'application_name': 'App3', 'repository_url': 'https://github.com/user/repo1.git/'},
+            {'application_name': 'App1', 'repository_url': 'https://github.com/user/repo1#develop'},
+            {'application_name': 'App1', 'repository_url': 'https://github.com/user/repo1', 'default_branch': 'develop'}
+        ]
+        # App3 shares App1's org; App2 has its own
+        org_mapping = {'App1': 'org1', 'App2': 'org2', 'App3': 'org1'}
+
+        unique = mapper._deduplicate_applications(applications, org_mapping)
+
+        assert unique == [applications[0], applications[2], applications[3], applications[5], applications[6]]
+        assert unique[0] is applications[0]
+
+    def test_empty_org_only_keeps_not_imported_duplicate(self):
+        """Test that an imported row listed before an 'N/A' copy does not hide it from --empty-org-only"""
+        mapper = SnykTargetMapper("test-group-id")
+        applications = [
+            {'application_name': 'App1', 'repository_url': 'https://github.com/user/repo1', 'organizations': 'org-1'},
+            {'application_name': 'App1', 'repository_url': 'https://github.com/user/repo1', 'organizations': 'N/A'},
+            {'application_name': 'App1', 'repository_url': 'https://github.com/user/repo2', 'organizations': 'N/A'},
+            {'application_name': 'App1', 'repository_url': 'https://github.com/user/repo2', 'organizations': 'N/A'}
+        ]
+
+        with patch.object(mapper, '_display_auth_status'), \
+             patch.object(mapper, 'get_organizations_from_group', return_value=[]), \
+             patch('create_targets.build_org_mapping', return_value={'App1': 'org1'}), \
+             patch.object(mapper, 'read_applications_from_csv', return_value=applications), \
+             patch.object(mapper, 'create_general_targets', return_value=[]) as mock_create:
+            mapper.create_targets_json('apps.csv', 'targets.json', 'github', empty_org_only=True, limit=2)
+
+        processed = mock_create.call_args[0][0]
+        assert processed == [applications[1], applications[2]]
+
+
+class TestRepositoryUrlParsing:
+    """Test owner/repo parsing of repository URLs"""
+
+    def test_parse_supported_url_formats(self):
+        """Test GitHub, Azure DevOps and unsupported Azure URL formats"""
+        mapper = SnykTargetMapper("test-group-id")
+
+        assert mapper._parse_repository_url('https://github.com/user/repo1') == ('user', 'repo1')
+        assert mapper._parse_repository_url('https://dev.azure.com/org/project/_git/repo1') == ('project', 'repo1')
+        assert mapper._parse_repository_url('https://dev.azure.com/org/project') is None
+        assert mapper._parse_repository_url('https://gitlab.com/group/subgroup/repo1/') == ('subgroup', 'repo1')
+        assert mapper._parse_repository_url('git@github.com:user/repo1') == ('user', 'repo1')
+        assert mapper._parse_repository_url('repo1') is None
+
+    def test_gitlab_project_api_url(self):
+        """Test GitLab API URL construction for gitlab.com, self-hosted and SSH URLs"""
+        mapper = SnykTargetMapper("test-group-id")
+
+        assert mapper._gitlab_project_api_url('https://gitlab.com/group/sub/project/') == (
+            'https://gitlab.com/api/v4/projects/group%2Fsub%2Fproject', 'group/sub/project')
+        assert mapper._gitlab_project_api_url('https://gitlab.example.com/group/project') == (
+            'https://gitlab.example.com/api/v4/projects/group%2Fproject', 'group/project')
+        assert mapper._gitlab_project_api_url('git@gitlab.example.com:group/project') == (
+            'https://gitlab.example.com/api/v4/projects/group%2Fproject', 'group/project')
+        assert mapper._gitlab_project_api_url('https://github.com/user/repo') is None
+
+    def test_gitlab_project_path_encoding_matches_quote(self):
+        """Test that the fast slash-only encoding agrees with requests.utils.quote"""
+        import requests
+        mapper = SnykTargetMapper("test-group-id")
+
+        for project_path in ['group/sub/my-project_1.0', 'group/proj~x', 'group/my project', 'grüppe/projekt']:
+            api_url, _ = mapper._gitlab_project_api_url(f'https://gitlab.com/{project_path}')
+            assert api_url == 'https://gitlab.com/api/v4/projects/' + requests.utils.quote(project_path, safe='')
+
+    def test_parsed_urls_are_cached(self):
+        """Test that a repeated URL is served from the cache"""
+        mapper = SnykTargetMapper("test-group-id")
+
+        first = mapper._parse_repository_url('https://github.com/user/repo1')
+        mapper._url_cache['https://github.com/user/repo1'] = ('cached', 'value')
+
+        assert first == ('user', 'repo1')
+        assert mapper._parse_repository_url('https://github.com/user/repo1') == ('cached', 'value')
+
+
+class TestIntegrationLookup:
+    """Test integration ID lookups against the loaded organization data"""
+
+    def create_orgs_file(self):
+        """Helper to write a minimal snyk-created-orgs.json"""
+        data = {'orgData': [
+            {'id': 'org1', 'name': 'App1', 'integrations': {'github': 'int-gh-1'}},
+            {'id': 'org2', 'name': 'App2', 'integrations': {'gitlab': 'int-gl-2'}}
+        ]}
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as f:
+            json.dump(data, f)
+        return f.name
+
+    def test_find_integration_id(self):
+        """Test lookups for existing and missing orgs and integration types"""
+        orgs_file = self.create_orgs_file()
+        try:
+            mapper = SnykTargetMapper("test-group-id", orgs_json_file=orgs_file)
+
+            assert mapper.find_integration_id('org1', 'GitHub') == 'int-gh-1'
+            assert mapper.find_integration_id('org2', 'gitlab') == 'int-gl-2'
+            assert mapper.find_integration_id('org2', 'github') is None
+            assert mapper.find_integration_id('missing-org', 'github') is None
+        finally:
+            os.unlink(orgs_file)
+
+    def test_find_integration_id_is_cached(self):
+        """Test that repeated lookups for the same org and type skip the org index"""
+        orgs_file = self.create_orgs_file()
+        try:
+            mapper = SnykTargetMapper("test-group-id", orgs_json_file=orgs_file)
+            mapper.find_integration_id('org1', 'github')
+
+            with patch.object(mapper, 'get_integrations_for_org') as mock_get_integrations:
+                assert mapper.find_integration_id('org1', 'github') == 'int-gh-1'
+                mock_get_integrations.assert_not_called()
+        finally:
+            os.unlink(orgs_file)
+
+
+class TestDefaultBranchCache:
+    """Test caching of default branch lookups"""
+
+    def test_default_branch_fetched_once_per_repository(self):
+        """Test that repeated and differently formatted URLs for one repo hit the API once"""
+        mapper = SnykTargetMapper("test-group-id")
+
+        with patch.object(mapper, '_fetch_default_branch', return_value='develop') as mock_fetch:
+            assert mapper.get_default_branch('https://github.com/User/Repo1', 'github') == 'develop'
+            assert mapper.get_default_branch('https://github.com/user/repo1/', 'github') == 'develop'
+            assert mapper.get_default_branch('https://github.com/user/repo2', 'github') == 'develop'
+
+            assert mock_fetch.call_count == 2
+
+    def test_commit_sha_and_csv_branch_skip_api_lookup(self):
+        """Test that a '#<sha>' URL or a CSV default branch skips the API lookup and a SHA never becomes the branch"""
+        mapper = SnykTargetMapper("test-group-id")
+        apps = [
+            {'application_name': 'App1', 'repository_url': 'https://github.com/user/repo1.git#3f2a9c1'},
+            {'application_name': 'App1', 'repository_url': 'https://github.com/user/repo2', 'default_branch': 'release/1.x'},
+            {'application_name': 'App1', 'repository_url': 'https://github.com/user/repo3', 'default_branch': ''}
+        ]
+
+        with patch.object(mapper, '_fetch_default_branch', return_value='develop') as mock_fetch:
+            assert mapper.get_default_branch('https://github.com/user/repo1#3f2a9c1', 'github') is None
+            with patch.object(mapper, 'find_integration_id', return_value='int-123'):
+                targets = mapper._process_repository_batch(
+                    apps, {'App1': 'org1'}, 'github', branch_override=None, files_override=None,
+                    exclusion_globs_override=None, max_workers=2
+                )
+
+            # Only the row with neither a commit SHA nor a CSV branch is looked up
+            mock_fetch.assert_called_once_with('https://github.com/user/repo3', 'github')
+
+        assert [target['target'] for target in targets] == [
+            {'name': 'repo1', 'owner': 'user'},
+            {'name': 'repo2', 'owner': 'user', 'branch': 'release/1.x'},
+            {'name': 'repo3', 'owner': 'user', 'branch': 'develop'}
+        ]
+
+    def test_non_sha_fragment_is_not_a_pin(self):
+        """Test that a '#<ref>' suffix that is not a hex commit SHA does not short-circuit the lookup"""
+        mapper = SnykTargetMapper("test-group-id")
+
+        with patch.object(mapper, '_fetch_default_branch', return_value='main') as mock_fetch:
+            assert mapper.get_default_branch('https://github.com/user/repo1#release', 'github') == 'main'
+            assert mapper.get_default_branch('https://github.com/user/repo1#3F2A9C1', 'github') == 'main'
+
+            assert mock_fetch.call_count == 2
+
+    def test_gitlab_project_info_cached_on_success(self):
+        """Test that successful GitLab lookups are cached under a normalized URL and failures are not"""
+        mapper = SnykTargetMapper("test-group-id")
+
+        with patch.object(mapper, '_fetch_gitlab_project_info', return_value={'id': 1, 'default_branch': 'main'}) as mock_fetch:
+            mapper.get_gitlab_project_info('https://gitlab.com/Group/Project.git', 'gitlab')
+            mapper.get_gitlab_project_info('https://gitlab.com/group/project/', 'gitlab')
+            assert mock_fetch.call_count == 1
+
+        with patch.object(mapper, '_fetch_gitlab_project_info', return_value=None) as mock_fetch:
+            mapper.get_gitlab_project_info('https://gitlab.com/group/other', 'gitlab')
+            mapper.get_gitlab_project_info('https://gitlab.com/group/other', 'gitlab')
+            assert mock_fetch.call_count == 2
+
+    def test_fetch_dispatches_by_source_type(self):
+        """Test that each source type queries its own SCM API and falls back to 'main'"""
+        mapper = SnykTargetMapper("test-group-id")
+
+        def api_response(url, *args, **kwargs):
+            if url.startswith('https://api.github.com/repos/user/repo1'):
+                return make_json_response({'default_branch': 'gh-main'})
+            elif url.startswith('https://gitlab.com/api/v4/projects/group%2Fproject1'):
+                return make_json_response({'default_branch': 'gl-main'})
+            elif url.startswith('https://dev.azure.com/org/project/_apis/git/repositories/repo1'):
+                return make_json_response({'defaultBranch': 'refs/heads/az-main'})
+            return None
+
+        with patch('create_targets.make_request_with_retry', side_effect=api_response):
+            assert mapper._fetch_default_branch('https://github.com/user/repo1.git', 'github-enterprise') == 'gh-main'
+            assert mapper._fetch_default_branch('https://gitlab.com/group/project1', 'gitlab') == 'gl-main'
+            assert mapper._fetch_default_branch('https://dev.azure.com/org/project/_git/repo1', 'azure-repos') == 'az-main'
+            assert mapper._fetch_default_branch('https://github.com/user/missing', 'github') == 'main'
+
+    def test_malformed_urls_skip_lookup(self):
+        """Test that oversized URLs or URLs with control characters are rejected before any API work"""
+        mapper = SnykTargetMapper("test-group-id")
+        long_url = 'https://github.com/user/' + 'a' * 2000
+
+        with patch.object(mapper, '_fetch_default_branch') as mock_fetch:
+            with patch.object(mapper, '_fetch_gitlab_project_info') as mock_gitlab:
+                assert mapper.get_default_branch(long_url, 'github') == 'main'
+                assert mapper.get_default_branch('https://github.com/user/re\x00po', 'github') == 'main'
+                assert mapper.get_gitlab_project_info('https://gitlab.com/group/\x1bproject', 'gitlab') is None
+
+                mock_fetch.assert_not_called()
+                mock_gitlab.assert_not_called()
+
+    def test_scheme_less_urls_still_looked_up(self):
+        """Test that URLs without a scheme, e.g. github.com/o/r, still get an API lookup"""
+        mapper = SnykTargetMapper("test-group-id")
+
+        with patch('create_targets.make_request_with_retry', return_value=make_json_response({'default_branch': 'develop'})) as mock_request:
+            assert mapper.get_default_branch('github.com/o/r', 'github') == 'develop'
+        assert mock_request.call_args[0][0] == 'https://api.github.com/repos/o/r'
+
+        with patch('create_targets.make_request_with_retry', return_value=make_json_response({'id': 5, 'default_branch': 'main'})) as mock_request:
+            assert mapper.get_gitlab_project_info('gitlab.com/group/project', 'gitlab') == {'id': 5, 'default_branch': 'main'}
+        assert mock_request.call_args[0][0] == 'https://gitlab.com/api/v4/projects/group%2Fproject'
+
+    def test_rejected_url_reported_once(self):
+        """Test that a URL skipped by the pre-check is reported, but only the first time"""
+        mapper = SnykTargetMapper("test-group-id")
+        bad_url = 'https://gitlab.example.com/group/\x07proj'
+
+        with patch('builtins.print') as mock_print:
+            assert mapper.get_gitlab_project_info(bad_url, 'gitlab') is None
+            assert mapper.get_default_branch(bad_url, 'gitlab') == 'main'
+
+        messages = [call[0][0] for call in mock_print.call_args_list]
+        assert len([message for message in messages if 'gitlab.example.com/group/' in message]) == 1
+
+    def test_unsupported_source_type_skips_lookup(self):
+        """Test that source types without a branch API return 'main' without fetching or caching"""
+        mapper = SnykTargetMapper("test-group-id")
+
+        with patch.object(mapper, '_fetch_default_branch') as mock_fetch:
+            assert mapper.get_default_branch('https://bitbucket.org/user/repo1', 'bitbucket-cloud') == 'main'
+
+            mock_fetch.assert_not_called()
+            assert mapper._branch_cache == {}
+
+
+class TestBatchOrdering:
+    """Test that concurrent processing keeps targets in input order"""
+
+    def test_targets_keep_input_order(self):
+        """Test that a slow early repository does not reorder the output"""
+        import time
+        mapper = SnykTargetMapper("test-group-id")
+        apps = [
+            {'application_name': f'App{i}', 'repository_url': f'https://github.com/user/repo{i}'}
+            for i in range(5)
+        ]
+        org_mapping = {f'App{i}': f'org{i}' for i in range(5)}
+
+        def slow_first_branch(repository_url, source_type):
+            if repository_url.endswith('repo0'):
+                time.sleep(0.2)
+            return 'main'
+
+        with patch.object(mapper, 'find_integration_id', return_value='int-123'):
+            with patch.object(mapper, 'get_default_branch', side_effect=slow_first_branch):
+                targets = mapper._process_repository_batch(
+                    apps, org_mapping, 'github', branch_override=None, files_override=None,
+                    exclusion_globs_override=None, max_workers=5
+                )
+
+        assert [target['target']['name'] for target in targets] == [f'repo{i}' for i in range(5)]
+
+    def test_branch_override_runs_without_thread_pool(self):
+        """Test that a branch override (no API calls) processes repositories inline"""
+        mapper = SnykTargetMapper("test-group-id")
+        apps = [{'application_name': 'App1', 'repository_url': 'https://github.com/user/repo1'}]
+
+        with patch.object(mapper, 'find_integration_id', return_value='int-123'):
+            with patch('create_targets.ThreadPoolExecutor') as mock_executor:
+                targets = mapper._process_repository_batch(
+                    apps, {'App1': 'org1'}, 'github', branch_override='main', files_override=None,
+                    exclusion_globs_override=None, max_workers=5
+                )
+
+        mock_executor.assert_not_called()
+        assert targets[0]['target']['branch'] == 'main'
+
+
+    def test_batch_emits_one_target_per_entry(self):
+        """Test that the batch processes every (already deduplicated) entry once, in order"""
+        mapper = SnykTargetMapper("test-group-id")
+        apps = [
+            {'application_name': 'App1', 'repository_url': 'https://github.com/user/repo1'},
+            {'application_name': 'App2', 'repository_url': 'https://github.com/user/repo2'}
+        ]
+        org_mapping = {'App1': 'org1', 'App2': 'org1'}
+
+        with patch.object(mapper, 'find_integration_id', return_value='int-123') as mock_find:
+            with patch.object(mapper, 'get_default_branch', return_value='main'):
+                targets = mapper._process_repository_batch(
+                    apps, org_mapping, 'github', branch_override=None, files_override=None,
+                    exclusion_globs_override=None, max_workers=2
+                )
+
+        assert mock_find.call_count == 2
+        assert [target['target']['name'] for target in targets] == ['repo1', 'repo2']
+
+
+class TestGitLabTargets:
+    """Test GitLab target creation"""
+
+    def test_gitlab_project_info_fetched_once_per_url(self):
+        """Test that project info is prefetched per unique URL and mapped back to every application"""
+        mapper = SnykTargetMapper("test-group-id")
+        mapper.max_workers = 4
+        apps = [
+            {'application_name': 'App1', 'repository_url': 'https://gitlab.com/group/project1'},
+            {'application_name': 'App2', 'repository_url': 'https://gitlab.com/group/project2'},
+            {'application_name': 'App3', 'repository_url': 'https://gitlab.com/group/project1'},
+            {'application_name': 'App4', 'repository_url': ''}
+        ]
+        org_mapping = {'App1': 'org1', 'App2': 'org2', 'App3': 'org3', 'App4': 'org4'}
+
+        def project_info(repository_url, source_type):
+            return {'id': int(repository_url[-1]), 'default_branch': 'develop'}
+
+        with patch.object(mapper, 'find_integration_id', return_value='int-gl'):
+            with patch.object(mapper, '_batch_gitlab_projects', return_value={}):
+                with patch.object(mapper, 'get_gitlab_project_info', side_effect=project_info) as mock_info:
+                    targets = mapper.create_gitlab_targets(apps, org_mapping, 'gitlab')
+
+        assert mock_info.call_count == 2
+        assert [(t['orgId'], t['target']['id']) for t in targets] == [('org1', 1), ('org2', 2), ('org3', 1)]
+        assert all(t['target']['branch'] == 'develop' for t in targets)
+
+    def test_missing_gitlab_default_branch_skips_second_lookup(self):
+        """Test that a project without a default branch gets no branch and no second API call"""
+        mapper = SnykTargetMapper("test-group-id")
+        apps = [{'application_name': 'App1', 'repository_url': 'https://gitlab.com/group/empty-project'}]
+
+        with patch.object(mapper, 'find_integration_id', return_value='int-gl'):
+            with patch.object(mapper, '_prefetch_gitlab_project_info',
+                              return_value={apps[0]['repository_url']: {'id': 7, 'default_branch': None}}):
+                with patch.object(mapper, 'get_default_branch') as mock_branch:
+                    targets = mapper.create_gitlab_targets(apps, {'App1': 'org1'}, 'gitlab')
+
+        mock_branch.assert_not_called()
+        assert targets[0]['target'] == {'id': 7}
+
+    def test_gitlab_graphql_batch_with_rest_fallback(self):
+        """Test that projects found by the GraphQL batch skip REST and the rest fall back to it"""
+        mapper = SnykTargetMapper("test-group-id")
+        mapper.max_workers = 1
+        urls = [
+            'https://gitlab.com/Group/Project1',
+            'https://gitlab.com/group/project2',
+            'https://gitlab.example.com/team/project3'
+        ]
+
+        gitlab_com_response = make_json_response({'data': {'projects': {'nodes': [
+            {'id': 'gid://gitlab/Project/11', 'fullPath': 'group/project1', 'repository': {'rootRef': 'develop'}}
+        ]}}})
+
+        def graphql_request(url, *args, **kwargs):
+            assert kwargs['json_body']['variables']['fullPaths']
+            return gitlab_com_response if url == 'https://gitlab.com/api/graphql' else None
+
+        with patch('create_targets.make_request_with_retry', side_effect=graphql_request) as mock_request:
+            with patch.object(mapper, '_fetch_gitlab_project_info', return_value={'id': 99, 'default_branch': 'main'}) as mock_rest:
+                infos = mapper._prefetch_gitlab_project_info(urls, 'gitlab')
+
+        assert mock_request.call_count == 2  # one GraphQL request per GitLab instance
+        assert infos[urls[0]] == {'id': 11, 'default_branch': 'develop'}
+        assert infos[urls[1]] == infos[urls[2]] == {'id': 99, 'default_branch': 'main'}
+        assert mock_rest.call_count == 2
+
+    def test_gitlab_graphql_malformed_node_falls_back_to_rest(self):
+        """Test that a GraphQL node with a bad id is skipped and its project looked up over REST"""
+        mapper = SnykTargetMapper("test-group-id")
+        mapper.max_workers = 1
+        urls = ['https://gitlab.com/group/project1', 'https://gitlab.com/group/project2']
+
+        response = make_json_response({'data': {'projects': {'nodes': [
+            {'id': 'gid://gitlab/Project/not-a-number', 'fullPath': 'group/project1'},
+            {'fullPath': 'group/project1'},
+            {'id': 'gid://gitlab/Project/12', 'fullPath': 'group/project2', 'repository': None}
+        ]}}})
+
+        with patch('create_targets.make_request_with_retry', return_value=response):
+            with patch.object(mapper, '_fetch_gitlab_project_info', return_value={'id': 99, 'default_branch': 'main'}) as mock_rest:
+                infos = mapper._prefetch_gitlab_project_info(urls, 'gitlab')
+
+        assert infos[urls[0]] == {'id': 99, 'default_branch': 'main'}
+        assert infos[urls[1]] == {'id': 12, 'default_branch': None}
+        mock_rest.assert_called_once_with(urls[0], 'gitlab')
+
+
+class TestMapperSession:
+    """Test the mapper's shared HTTP session"""
+
+    def test_close_releases_session(self):
+        """Test that close() closes the pooled session"""
+        mapper = SnykTargetMapper("test-group-id")
+
+        with patch.object(mapper.session, 'close') as mock_close:
+            mapper.close()
+
+        mock_close.assert_called_once()
+
+
+class TestAuthHeaderCache:
+    """Test per-mapper caching of SCM auth headers"""
+
+    def test_auth_headers_built_once_per_scm(self):
+        """Test that the environment is only consulted on the first lookup per SCM type"""
+        mapper = SnykTargetMapper("test-group-id")
+
+        with patch.dict(os.environ, {'AZURE_DEVOPS_TOKEN': 'token123'}):
+            with patch('create_targets.get_auth_headers', wraps=create_targets.get_auth_headers) as mock_get:
+                first = mapper._get_auth_headers('azure', 'azure-repos')
+                second = mapper._get_auth_headers('azure', 'azure-repos')
+
+                assert first is second
+                assert first['Authorization'].startswith('Basic ')
+                assert mock_get.call_count == 1
+
+    def test_new_mapper_picks_up_new_token(self):
+        """Test that a changed token is kept by an existing mapper and seen by a fresh one"""
+        mapper = SnykTargetMapper("test-group-id")
+
+        with patch.dict(os.environ, {'GITLAB_TOKEN': 'first'}):
+            assert mapper._get_auth_headers('gitlab', 'gitlab') == {'PRIVATE-TOKEN': 'first'}
+        with patch.dict(os.environ, {'GITLAB_TOKEN': 'second'}):
+            assert mapper._get_auth_headers('gitlab', 'gitlab') == {'PRIVATE-TOKEN': 'first'}
+            fresh_mapper = SnykTargetMapper("test-group-id")
+            assert fresh_mapper._get_auth_headers('gitlab', 'gitlab') == {'PRIVATE-TOKEN': 'second'}
+
+
+class TestBuildOrgMapping:
+    """Test the application name to org ID mapping"""
+
+    def test_build_org_mapping(self):
+        """Test that each org display name maps to its ID"""
+        orgs = [
+            {'id': 'org1', 'name': 'App1', 'display_name': 'App1', 'slug': 'app1'},
+            {'id': 'org2', 'name': 'App Two', 'display_name': 'App Two', 'slug': 'app-two'}
+        ]
+
+        assert build_org_mapping(orgs) == {'App1': 'org1', 'App Two': 'org2'}
+        assert build_org_mapping([]) == {}
+
+
 if __name__ == '__main__':
     pytest.main([__file__])
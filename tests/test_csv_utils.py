@@ -125,6 +125,68 @@ class TestReadApplicationsFromCsv:
         finally:
             os.unlink(csv_file)
     
+    def test_read_applications_blank_cells_are_empty_strings(self):
+        """Test that blank cells and missing optional columns come back as '' rather than 'nan'"""
+        test_data = [
+            ['Type', 'Asset', 'Repository URL', 'Application'],
+            ['Repository', 'repo1', '', 'App1']
+        ]
+
+        csv_file = self.create_test_csv(test_data)
+
+        try:
+            applications = read_applications_from_csv(csv_file, logger=MagicMock())
+
+            assert len(applications) == 1
+            assert applications[0]['repository_url'] == ''
+            assert applications[0]['asset_source'] == ''
+            assert applications[0]['organizations'] == ''
+
+        finally:
+            os.unlink(csv_file)
+
+    def test_read_applications_adds_normalized_fields(self):
+        """Test that lowercased/stripped URL and source fields are emitted alongside the raw values"""
+        test_data = [
+            ['Type', 'Asset', 'Repository URL', 'Application', 'Asset Source'],
+            ['Repository', 'repo1', ' https://GitHub.com/User/Repo1 ', 'App1', 'GitHub ']
+        ]
+
+        csv_file = self.create_test_csv(test_data)
+
+        try:
+            for pandas_available in (True, False):
+                with patch('csv_utils.PANDAS_AVAILABLE', pandas_available):
+                    applications = read_applications_from_csv(csv_file)
+
+                assert applications[0]['repository_url'] == ' https://GitHub.com/User/Repo1 '
+                assert applications[0]['repository_url_norm'] == 'https://github.com/user/repo1'
+                assert applications[0]['asset_source_norm'] == 'github'
+
+        finally:
+            os.unlink(csv_file)
+
+    def test_read_applications_optional_default_branch(self):
+        """Test that the optional Default Branch column is read when present and blank otherwise"""
+        with_branch = [
+            ['Type', 'Asset', 'Repository URL', 'Application', 'Default Branch'],
+            ['Repository', 'repo1', 'https://github.com/user/repo1', 'App1', 'develop'],
+            ['Repository', 'repo2', 'https://github.com/user/repo2', 'App2', '']
+        ]
+        without_branch = [row[:4] for row in with_branch]
+
+        csv_files = [self.create_test_csv(with_branch), self.create_test_csv(without_branch)]
+
+        try:
+            for pandas_available in (True, False):
+                with patch('csv_utils.PANDAS_AVAILABLE', pandas_available):
+                    assert [app['default_branch'] for app in read_applications_from_csv(csv_files[0])] == ['develop', '']
+                    assert [app['default_branch'] for app in read_applications_from_csv(csv_files[1])] == ['', '']
+
+        finally:
+            for csv_file in csv_files:
+                os.unlink(csv_file)
+
     def test_read_applications_empty_file(self):
         """Test handling of empty CSV file"""
         csv_file = self.create_test_csv([])
@@ -182,6 +244,54 @@ class TestReadApplicationsFromCsv:
         finally:
             os.unlink(csv_file)
     
+    def test_read_applications_stdlib_matches_pandas(self):
+        """Test that the csv module fallback produces the same entries as the pandas path"""
+        test_data = [
+            ['Type', 'Asset', 'Repository URL', 'Application', 'Organizations'],
+            ['Repository', 'repo1', 'https://github.com/user/repo1', 'App1, App2', ''],
+            ['Container', 'image1', '', 'App1', ''],
+            ['Repository', 'repo2', 'https://github.com/user/repo2', 'n/a', ''],
+            ['repository', 'repo3', 'https://github.com/user/repo3', ' App3 , null', 'org-1'],
+            ['Repository', 'repo4', 'https://github.com/user/repo4', 'App4', 'N/A']
+        ]
+
+        csv_file = self.create_test_csv(test_data)
+
+        try:
+            pandas_apps = read_applications_from_csv(csv_file)
+            with patch('csv_utils.PYARROW_AVAILABLE', False):
+                chunked_apps = read_applications_from_csv(csv_file)
+            with patch('csv_utils.PANDAS_AVAILABLE', False):
+                stdlib_apps = read_applications_from_csv(csv_file)
+
+            assert [app['application_name'] for app in pandas_apps] == ['App1', 'App2', 'App3', 'App4']
+            assert [app['row_index'] for app in pandas_apps] == [0, 0, 3, 4]
+            # 'N/A' is kept verbatim rather than parsed as a missing value
+            assert pandas_apps[-1]['organizations'] == 'N/A'
+            assert chunked_apps == pandas_apps
+            assert stdlib_apps == pandas_apps
+
+        finally:
+            os.unlink(csv_file)
+
+    def test_read_applications_across_chunks(self):
+        """Test that chunked pandas reading keeps order and row indices across chunk boundaries"""
+        test_data = [['Type', 'Asset', 'Repository URL', 'Application']]
+        for i in range(7):
+            test_data.append(['Repository', f'repo{i}', f'https://github.com/user/repo{i}', f'App{i}'])
+
+        csv_file = self.create_test_csv(test_data)
+
+        try:
+            with patch('csv_utils.PYARROW_AVAILABLE', False), patch('csv_utils.CSV_CHUNK_SIZE', 3):
+                applications = read_applications_from_csv(csv_file)
+
+            assert [app['asset_name'] for app in applications] == [f'repo{i}' for i in range(7)]
+            assert [app['row_index'] for app in applications] == list(range(7))
+
+        finally:
+            os.unlink(csv_file)
+
     def test_read_applications_handles_missing_columns(self):
         """Test handling of missing columns gracefully"""
         test_data = [
@@ -197,7 +307,12 @@ class TestReadApplicationsFromCsv:
             
             # Function returns empty list when required columns are missing
             assert len(applications) == 0
-            
+
+            # The header is checked before pandas parses any rows
+            with patch('csv_utils.pd') as mock_pd:
+                assert read_applications_from_csv(csv_file, logger=mock_logger) == []
+                mock_pd.read_csv.assert_not_called()
+
         finally:
             os.unlink(csv_file)
 
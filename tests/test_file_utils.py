@@ -13,13 +13,18 @@ from unittest.mock import patch, MagicMock
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+import file_utils
 from file_utils import (
     sanitize_path, 
     sanitize_input_path, 
     safe_write_json, 
+    write_json_file,
+    serialize_json,
     validate_file_exists, 
     validate_positive_integer,
     validate_non_empty_string,
+    validate_positive_integers,
+    validate_non_empty_strings,
     log_error_and_exit
 )
 
@@ -56,6 +61,20 @@ class TestSanitizePath:
         """Test normal relative path with input sanitization"""
         result = sanitize_input_path("data/file.csv")
         assert result == "data/file.csv"
+    
+    def test_sanitize_plain_filename_skips_normalization(self):
+        """Test that bare filenames are returned as-is without calling normpath"""
+        with patch('file_utils.os.path.normpath') as mock_normpath:
+            assert sanitize_path("import-targets.json") == "import-targets.json"
+            assert sanitize_input_path("data.csv") == "data.csv"
+            mock_normpath.assert_not_called()
+    
+    def test_sanitize_path_allows_dots_inside_names(self):
+        """Test that '..' is only rejected as a whole path component"""
+        assert sanitize_path("v1..v2/report..json") == "v1..v2/report..json"
+        assert sanitize_input_path("/data/...hidden/file.csv") == "/data/...hidden/file.csv"
+        with pytest.raises(ValueError):
+            sanitize_input_path("..")
 
 
 class TestSafeWriteJson:
@@ -110,6 +129,55 @@ class TestSafeWriteJson:
                 os.unlink(temp_filename)
 
 
+class TestWriteJsonFile:
+    """Test JSON writing to pre-validated output paths"""
+    
+    def test_write_json_file_matches_stdlib_format(self):
+        """Test that output is 2-space indented JSON with or without orjson"""
+        test_data = {"targets": [{"orgId": "org1", "target": {"name": "repo", "owner": "user"}}]}
+        
+        for orjson_available in (True, False):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                output_path = os.path.join(tmp_dir, 'import-targets.json')
+                
+                with patch('file_utils.ORJSON_AVAILABLE', orjson_available and file_utils.ORJSON_AVAILABLE):
+                    write_json_file(test_data, output_path)
+                
+                with open(output_path, 'r') as f:
+                    assert f.read() == json.dumps(test_data, indent=2)
+    
+    def test_serialize_json_non_ascii_matches_orjson(self):
+        """Test that the stdlib fallback writes non-ASCII text as raw UTF-8 like orjson does"""
+        test_data = {"targets": [{"orgId": "org1", "target": {"name": "café-日本", "owner": "Zoë"}}]}
+        
+        with patch('file_utils.ORJSON_AVAILABLE', False):
+            fallback_output = serialize_json(test_data)
+        
+        assert 'café-日本'.encode('utf-8') in fallback_output
+        if file_utils.ORJSON_AVAILABLE:
+            assert serialize_json(test_data) == fallback_output
+    
+    def test_write_json_file_permission_error_exits(self):
+        """Test that write failures exit with an error"""
+        with patch('builtins.open', side_effect=PermissionError):
+            with pytest.raises(SystemExit):
+                write_json_file({"test": True}, 'import-targets.json')
+    
+    def test_write_json_file_failure_keeps_existing_file(self):
+        """Test that a failed write leaves the previous output intact and no temporary file behind"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_path = os.path.join(tmp_dir, 'orgs.json')
+            write_json_file({"orgs": []}, output_path)
+            
+            with patch('file_utils.serialize_json', side_effect=TypeError("not serializable")):
+                with pytest.raises(SystemExit):
+                    write_json_file({"orgs": [object()]}, output_path)
+            
+            assert os.listdir(tmp_dir) == ['orgs.json']
+            with open(output_path, 'r') as f:
+                assert json.load(f) == {"orgs": []}
+
+
 class TestValidationFunctions:
     """Test validation helper functions"""
     
@@ -144,6 +212,23 @@ class TestValidationFunctions:
         with pytest.raises(SystemExit):
             validate_non_empty_string("   ", "--test-arg", None)
     
+    def test_batch_validators_report_every_invalid_field(self):
+        """Test that batch validators pass valid input and report all failures in one message"""
+        validate_positive_integers({"--limit": None, "--max-workers": 4}, None)
+        validate_non_empty_strings({"Group ID": "abc"}, None)
+        
+        with patch('builtins.print') as mock_print:
+            with pytest.raises(SystemExit):
+                validate_positive_integers({"--limit": 0, "--max-workers": 4, "--rate-limit": -1}, None)
+        message = mock_print.call_args[0][0]
+        assert "--limit" in message and "--rate-limit" in message and "--max-workers" not in message
+        
+        with patch('builtins.print') as mock_print:
+            with pytest.raises(SystemExit):
+                validate_non_empty_strings({"Group ID": " ", "Source org ID": ""}, None)
+        assert mock_print.call_count == 1
+        assert "Group ID" in mock_print.call_args[0][0] and "Source org ID" in mock_print.call_args[0][0]
+    
     def test_validate_file_exists_valid(self):
         """Test file existence validation with existing file"""
         with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
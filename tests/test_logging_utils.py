@@ -7,13 +7,14 @@ import pytest
 import os
 import sys
 import logging
+import logging.handlers
 import tempfile
 from unittest.mock import patch, MagicMock
 
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from logging_utils import setup_logging
+from logging_utils import setup_logging, log_api_request, log_api_response, log_progress, log_error_with_context
 
 
 class TestSetupLogging:
@@ -79,6 +80,73 @@ class TestSetupLogging:
         # Should return the same logger instance
         assert logger1 is logger2
     
+    def test_setup_logging_repeat_call_reuses_debug_handlers(self):
+        """Test that a second identical debug setup keeps the first log file instead of opening another"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with patch.dict(os.environ, {'SNYK_LOG_PATH': temp_dir}):
+                logger = setup_logging('repeat_debug_test', debug=True)
+                handlers = list(logger.handlers)
+                
+                assert setup_logging('repeat_debug_test', debug=True).handlers == handlers
+                assert len(os.listdir(temp_dir)) == 1
+                
+                # Changing the settings reconfigures the logger
+                setup_logging('repeat_debug_test', debug=False)
+                assert any(isinstance(handler, logging.NullHandler) for handler in logger.handlers)
+            
+            for handler in handlers:
+                handler.close()
+    
+    def test_setup_logging_disabled_logger_ignores_log_path_changes(self):
+        """Test that a non-debug logger is reused even when SNYK_LOG_PATH changes"""
+        logger = setup_logging('null_reuse_test')
+        handlers = list(logger.handlers)
+        
+        with patch.dict(os.environ, {'SNYK_LOG_PATH': '/some/other/path'}):
+            assert setup_logging('null_reuse_test').handlers == handlers
+        assert logger.propagate is False
+    
+    def test_setup_logging_buffers_file_writes_until_error(self):
+        """Test that debug records reach the log file in batches, with errors flushed immediately"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with patch.dict(os.environ, {'SNYK_LOG_PATH': temp_dir}):
+                logger = setup_logging('buffered_file_test', debug=True)
+                log_file = os.path.join(temp_dir, os.listdir(temp_dir)[0])
+                
+                with patch('sys.stderr'):
+                    logger.debug("buffered debug message")
+                    with open(log_file) as f:
+                        assert "buffered debug message" not in f.read()
+                    
+                    logger.error("flushing error message")
+                with open(log_file) as f:
+                    content = f.read()
+                assert "buffered debug message" in content
+                assert "flushing error message" in content
+            
+            for handler in logger.handlers:
+                target = getattr(handler, 'target', None)
+                handler.close()
+                if target:
+                    target.close()
+    
+    def test_setup_logging_reconfigure_flushes_buffered_records(self):
+        """Test that reconfiguring a debug logger writes out its buffered records and closes the file"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with patch.dict(os.environ, {'SNYK_LOG_PATH': temp_dir}):
+                logger = setup_logging('reconfigure_flush_test', debug=True)
+                buffered_handler = next(h for h in logger.handlers if isinstance(h, logging.handlers.MemoryHandler))
+                file_handler = buffered_handler.target
+                log_file = file_handler.baseFilename
+                
+                with patch('sys.stderr'):
+                    logger.debug("buffered before reconfigure")
+                setup_logging('reconfigure_flush_test', debug=False)
+                
+                with open(log_file) as f:
+                    assert "buffered before reconfigure" in f.read()
+                assert file_handler.stream is None
+    
     def test_logger_output_format(self):
         """Test that logger output has correct format"""
         with patch('sys.stdout') as mock_stdout:
@@ -198,6 +266,45 @@ class TestLoggingIntegration:
                         handler.flush()
 
 
+class TestLoggingHelpers:
+    """Test the API/progress logging helpers"""
+    
+    def test_helpers_skip_formatting_when_debug_disabled(self):
+        """Test that debug-only helpers do no work when the logger is not at DEBUG"""
+        mock_logger = MagicMock()
+        mock_logger.isEnabledFor.return_value = False
+        
+        log_api_request(mock_logger, 'GET', 'https://api.example.com', {'Authorization': 'token abcdefghijkl'})
+        log_api_response(mock_logger, 200, 'https://api.example.com', 0.5, 100)
+        log_progress(mock_logger, 1, 2, "repository")
+        
+        mock_logger.debug.assert_not_called()
+    
+    def test_error_context_skips_stack_capture_when_debug_disabled(self):
+        """Test that errors are still logged but no traceback is formatted without DEBUG"""
+        mock_logger = MagicMock()
+        mock_logger.isEnabledFor.return_value = False
+        
+        with patch('logging_utils.traceback') as mock_traceback:
+            log_error_with_context(mock_logger, "Request failed", ValueError("bad"))
+            log_error_with_context(mock_logger, "Client error")
+        
+        assert mock_logger.error.call_count == 4
+        mock_traceback.format_exc.assert_not_called()
+        mock_traceback.format_stack.assert_not_called()
+        mock_logger.debug.assert_not_called()
+    
+    def test_helpers_pass_arguments_for_deferred_formatting(self):
+        """Test that messages are passed as format strings plus arguments"""
+        mock_logger = MagicMock()
+        mock_logger.isEnabledFor.return_value = True
+        
+        log_progress(mock_logger, 1, 4, "repository")
+        
+        args = mock_logger.debug.call_args[0]
+        assert args[0] % args[1:] == "📊 Progress: 1/4 repositorys processed (25.0%)"
+
+
 if __name__ == '__main__':
     pytest.main([__file__])
 
@@ -14,7 +14,7 @@ from pathlib import Path
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from file_utils import build_output_path_in_logs, safe_write_json_to_logs
+from file_utils import build_output_path_in_logs, safe_write_json_to_logs, clear_log_dir_cache
 
 
 class TestBuildOutputPathInLogs:
@@ -99,6 +99,30 @@ class TestBuildOutputPathInLogs:
                 assert "Using SNYK_LOG_PATH for output:" in log_message
                 assert filename in log_message
 
+    
+    def test_filename_path_components_are_stripped(self):
+        """Test that directory components in the filename cannot escape SNYK_LOG_PATH"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with patch.dict(os.environ, {'SNYK_LOG_PATH': tmp_dir}):
+                assert build_output_path_in_logs("../../etc/passwd") == str(Path(tmp_dir).resolve() / "passwd")
+                
+                with pytest.raises(SystemExit):
+                    build_output_path_in_logs("..")
+    
+    def test_directory_validation_is_cached(self):
+        """Test that the log directory is only validated once per SNYK_LOG_PATH value"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with patch.dict(os.environ, {'SNYK_LOG_PATH': tmp_dir}):
+                build_output_path_in_logs("first.json")
+                
+                with patch('file_utils.os.access') as mock_access:
+                    assert build_output_path_in_logs("second.json") == str(Path(tmp_dir).resolve() / "second.json")
+                    mock_access.assert_not_called()
+                    
+                    clear_log_dir_cache()
+                    build_output_path_in_logs("third.json")
+                    mock_access.assert_called_once()
+
 
 class TestSafeWriteJsonToLogs:
     """Test safe JSON writing to SNYK_LOG_PATH"""